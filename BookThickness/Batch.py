@@ -0,0 +1,137 @@
+"""Batch.py
+@author lmartin5
+
+This file contains the functions that search many graphs at once. Graphs are read one at a time from a
+JSONL stream (one graph per line), and a window of them is kept in memory so the smallest ones can be
+handed to a pool of processes first. A result is written out as soon as its graph is done, so the whole
+batch is never held in memory and results come back in the order the searches finish. Each line is either
+a list of edges, i.e. [[1, 2], [2, 3]], or an object with an "edges" list and an optional "id", which is
+copied into the result. It is run from the command line with "python -m BookThickness batch", see __main__.py.
+"""
+
+import concurrent.futures
+import heapq
+import json
+import time
+import BookThickness.Permutations as Perms
+from BookThickness.SearchStats import SearchStats
+from BookThickness.SimpleGraph import SimpleGraph
+
+def read_graphs(lines):
+    """
+    Reads graphs from JSONL lines, one at a time
+    Parameters:
+        lines: an iterable of strings (i.e. an open file), each one a graph in JSON
+    Returns:
+        a generator of dicts with the "id" and "edges" of each graph, lines that cannot be read give a dict
+        with an "error" instead, and blank lines are skipped
+        a graph without an "id" gets its line number
+    """
+    line_number = 0
+    for line in lines:
+        line_number += 1
+        if len(line.strip()) == 0:
+            continue
+        try:
+            record = json.loads(line)
+            if type(record) is list:
+                record = {"edges": record}
+            if type(record) is not dict or "edges" not in record:
+                raise ValueError("each line must be a list of edges or an object with an \"edges\" list")
+            edges = [tuple(edge) for edge in record["edges"]]
+            for edge in edges:
+                if len(edge) != 2 or type(edge[0]) is not int or type(edge[1]) is not int:
+                    raise ValueError("every edge must be a pair of integers")
+            yield {"id": record.get("id", line_number), "edges": edges}
+        except (ValueError, TypeError) as error:
+            yield {"id": line_number, "error": str(error)}
+
+def estimate_cost(record):
+    # the number of spines times the number of edges, so the graphs that are fastest to search go first
+    if "error" in record:
+        return 0
+    num_vertices = 0
+    for edge in record["edges"]:
+        num_vertices = max(num_vertices, max(edge))
+    return Perms.count_spines(num_vertices) * len(record["edges"])
+
+def search_graph(record, options):
+    """
+    Finds a book embedding with the fewest pages for one graph, run in the worker processes
+    Parameters:
+        record: a dict with the "id" and "edges" of the graph, as given by read_graphs
+        options: a dict of keyword arguments for SimpleGraph.find_book_embedding (i.e. method, symmetry)
+    Returns:
+        result: a dict with the "id", "book_thickness", "spine", "pages" (a list of [a, b, page]), the lower
+                bound and whether it was tight, and the "seconds" the search took, or with an "error"
+    """
+    if "error" in record:
+        return record
+    start = time.perf_counter()
+    try:
+        graph = SimpleGraph(record["edges"])
+        if graph.num_edges == 0:
+            return {"id": record["id"], "book_thickness": 0, "spine": graph.vertices, "pages": [],
+                    "seconds": time.perf_counter() - start}
+        # the progress messages of every graph would be mixed together, so the workers print nothing
+        book_embedding = graph.find_book_embedding(stats=SearchStats(quiet=True), **options)
+    except Exception as error:
+        return {"id": record["id"], "error": str(error)}
+
+    pages = []
+    for edge, page_number in book_embedding.addedEdges:
+        pages.append([edge[0], edge[1], page_number])
+    pages.sort()
+    return {"id": record["id"], "book_thickness": book_embedding.numPages, "spine": book_embedding.spine,
+            "pages": pages, "lower_bound": book_embedding.lowerBound, "bound_tight": book_embedding.isBoundTight,
+            "seconds": time.perf_counter() - start}
+
+def iter_batch_results(records, workers=1, window=None, options=None):
+    """
+    Searches a stream of graphs on a pool of processes, shortest jobs first
+    Parameters:
+        records: an iterable of graphs, as given by read_graphs
+        workers: an integer, the number of processes
+        window: an integer, how many graphs are read ahead to pick the smallest from (4 * workers by default)
+        options: a dict of keyword arguments for SimpleGraph.find_book_embedding
+    Returns:
+        a generator of results (see search_graph), in the order the searches finish
+    """
+    if window is None:
+        window = 4 * workers
+    window = max(window, workers)
+    if options is None:
+        options = {}
+
+    records = iter(records)
+    waiting = []
+    counter = 0
+    running = set()
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        while (True):
+            # keep the window full, the heap gives the cheapest graph read so far
+            while len(waiting) + len(running) < window:
+                record = next(records, None)
+                if record is None:
+                    break
+                heapq.heappush(waiting, (estimate_cost(record), counter, record))
+                counter += 1
+
+            while len(running) < workers and len(waiting) > 0:
+                record = heapq.heappop(waiting)[2]
+                running.add(executor.submit(search_graph, record, options))
+
+            if len(running) == 0:
+                return
+            done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def run_batch(input_file, output_file, workers=1, window=None, options=None):
+    # writes one JSON line per graph to output_file as soon as it is done, returns the number of graphs
+    num_graphs = 0
+    for result in iter_batch_results(read_graphs(input_file), workers, window, options):
+        output_file.write(json.dumps(result) + "\n")
+        output_file.flush()
+        num_graphs += 1
+    return num_graphs
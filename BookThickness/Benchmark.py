@@ -0,0 +1,262 @@
+"""Benchmark.py
+@author lmartin5
+
+This file contains the benchmarks, run with "python -m BookThickness bench". Each workload is a fixed
+piece of work: a graph (a complete graph, a complete bipartite graph, the total graph of Z_3 x Z_3 from
+main.py, or a random graph with a fixed seed), a number of pages, a method, and the first few spines of
+iter_spines to search one at a time with find_n_page_embedding_with_spine. Every spine is searched whether
+or not it has an embedding, so the amount of work never changes. There are also workloads for generating
+spines on their own and for building BookEmbeddings. Each workload runs in a new process, so its peak
+memory is its own, and it is run a few times and the fastest run is kept. The results can be saved as JSON
+and compared with a saved baseline, and a workload that got slower by more than the tolerance fails.
+"""
+
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import BookThickness.BookThickness as BookThickness
+import BookThickness.ConflictGraph as ConflictGraph
+import BookThickness.Permutations as Perms
+from BookThickness.EmbeddingState import SpineContext
+from BookThickness.SearchStats import SearchStats
+from BookThickness.SimpleGraph import SimpleGraph
+
+# name: (graph, number of pages, method, number of spines), see get_workload_graph for the graphs
+# each workload takes around half a second, so that a 10% change is more than the noise between runs, and
+# small graphs go through their spines more than once to get there
+SEARCH_WORKLOADS = {
+    "complete-6-bfs": ("K6", 3, "bfs", 1200),
+    "complete-7-bfs": ("K7", 3, "bfs", 600),
+    "complete-7-dfs": ("K7", 3, "dfs", 2000),
+    "complete-7-coloring": ("K7", 3, "coloring", 4000),
+    "complete-8-coloring": ("K8", 3, "coloring", 4000),
+    "bipartite-4-4-bfs": ("K4,4", 2, "bfs", 8000),
+    "bipartite-4-4-coloring": ("K4,4", 2, "coloring", 12000),
+    "bipartite-5-5-coloring": ("K5,5", 3, "coloring", 5000),
+    "z3xz3-bfs": ("Z3xZ3", 2, "bfs", 9000),
+    "z3xz3-dfs": ("Z3xZ3", 2, "dfs", 10000),
+    "z3xz3-coloring": ("Z3xZ3", 2, "coloring", 10000),
+    "random-sparse-coloring": ("sparse", 2, "coloring", 15000),
+    "random-dense-dfs": ("dense", 3, "dfs", 1200),
+    "random-dense-coloring": ("dense", 3, "coloring", 5000),
+}
+# name: (number of vertices, number of passes), for the workloads that only generate spines
+SPINE_WORKLOADS = {
+    "spines-iter-11": (11, 1),
+    "spines-list-10": (10, 4),
+    "spines-range-11": (11, 2),
+}
+# name: (graph, number of pages, number of embeddings), for the workloads that build BookEmbeddings
+EMBEDDING_WORKLOADS = {
+    "book-embedding-k8": ("K8", 4, 50000),
+}
+# the number of different spines the embedding workloads colour before the timing starts
+EMBEDDING_SPINES = 500
+WORKLOADS = list(SEARCH_WORKLOADS) + list(SPINE_WORKLOADS) + list(EMBEDDING_WORKLOADS)
+
+def get_workload_graph(name):
+    # the edges of a workload graph, the random graphs always use the same seed
+    if name[0] == "K" and "," in name:
+        n, m = name[1:].split(",")
+        return SimpleGraph.complete_bipartite_graph(int(n), int(m)).edges
+    if name[0] == "K":
+        return SimpleGraph.complete_graph(int(name[1:])).edges
+    if name == "Z3xZ3":
+        return [(1, 2), (1, 3), (1, 4), (1, 7), (2, 3), (2, 6), (2, 9), (3, 5), (3, 8), (4, 7), (4, 8), (4, 9),
+                (5, 6), (5, 7), (5, 8), (5, 9), (6, 7), (6, 8), (6, 9), (8, 9)]
+    if name == "sparse":
+        num_vertices, probability = 10, 0.3
+    else:
+        num_vertices, probability = 9, 0.7
+    generator = random.Random(num_vertices)
+    edges = [edge for edge in itertools.combinations(range(1, num_vertices + 1), 2) if generator.random() < probability]
+    # every vertex is kept on the spine, even if the random edges miss it
+    return SimpleGraph(edges + [(num_vertices - 1, num_vertices)]).edges
+
+def get_peak_memory():
+    # the peak resident memory of this process in kilobytes, or None where the resource module is missing
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # macOS gives bytes instead of kilobytes
+        peak //= 1024
+    return peak
+
+def run_workload(name):
+    """
+    Runs one workload once, in the process it is called in
+    Parameters:
+        name: the name of a workload in WORKLOADS
+    Returns:
+        result: a dict with the "seconds" it took, the number of "spines" searched or generated, the
+                "nodes" expanded (partial embeddings grown, or steps of the colouring search, 0 for the
+                workloads that do not search)
+                and the "peak_memory" of the process in kilobytes
+    """
+    # nodes are the partial embeddings expanded by the "bfs" and "dfs" methods and the backtracking steps of
+    # the "coloring" method, as counted by SearchStats
+    stats = SearchStats(quiet=True)
+    num_spines = 0
+    if name in SEARCH_WORKLOADS:
+        graph, n, method, limit = SEARCH_WORKLOADS[name]
+        edges = get_workload_graph(graph)
+        spines = list(itertools.islice(itertools.cycle(Perms.iter_spines(BookThickness.get_num_vertices(edges))), limit))
+        start = time.perf_counter()
+        for spine in spines:
+            BookThickness.find_n_page_embedding_with_spine(n, edges.copy(), spine, method, stats)
+        seconds = time.perf_counter() - start
+        num_spines = len(spines)
+    elif name in SPINE_WORKLOADS:
+        num_vertices, passes = SPINE_WORKLOADS[name]
+        start = time.perf_counter()
+        for i in range(passes):
+            if name.startswith("spines-list"):
+                num_spines += len(Perms.get_spines(num_vertices))
+            elif name.startswith("spines-range"):
+                # an eighth of the spines from a quarter of the way in, as one shard would go through them
+                total = Perms.count_spines(num_vertices)
+                for spine in Perms.iter_spine_range(num_vertices, total // 4, total // 4 + total // 8):
+                    num_spines += 1
+            else:
+                for spine in Perms.iter_spines(num_vertices):
+                    num_spines += 1
+        seconds = time.perf_counter() - start
+    elif name in EMBEDDING_WORKLOADS:
+        graph, n, count = EMBEDDING_WORKLOADS[name]
+        edges = get_workload_graph(graph)
+        spines = list(itertools.islice(Perms.iter_spines(BookThickness.get_num_vertices(edges)), EMBEDDING_SPINES))
+        assignments = []
+        for spine in spines:
+            context = SpineContext(edges, spine)
+            colors = ConflictGraph.find_coloring(context.crossings, n)[0]
+            assignments.append(dict(zip(context.edges, colors)))
+        start = time.perf_counter()
+        for spine, pages in itertools.islice(itertools.cycle(zip(spines, assignments)), count):
+            BookThickness.embedding_from_pages(n, edges, spine, pages)
+        seconds = time.perf_counter() - start
+        num_spines = count
+    else:
+        raise Exception("There is no workload called " + str(name) + ", the workloads are " + ", ".join(WORKLOADS) + ".")
+
+    return {"seconds": seconds, "spines": num_spines, "nodes": stats.nodes_expanded, "peak_memory": get_peak_memory()}
+
+def run_workload_in_process(name):
+    # a new interpreter (spawned, not forked) for every run, so the peak memory of one workload is not mixed
+    # with the memory of the ones before it
+    context = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(1, mp_context=context) as executor:
+        return executor.submit(run_workload, name).result()
+
+def run_benchmarks(names=None, repeat=3, report=None):
+    """
+    Runs workloads, each one in its own process
+    Parameters:
+        names: a list of workload names, or None for every workload
+        repeat: an integer, the number of runs of each workload, the fastest one is kept
+        report: a function called with (name, result) as each workload finishes, or None
+    Returns:
+        results: a dict with the "machine" the benchmarks ran on and the "workloads", a dict of name -> result
+                 where a result has the "seconds", "spines", "spines_per_second", "nodes" and "peak_memory"
+    """
+    if names is None:
+        names = WORKLOADS
+    for name in names:
+        if name not in WORKLOADS:
+            raise Exception("There is no workload called " + str(name) + ", the workloads are " + ", ".join(WORKLOADS) + ".")
+    if (type(repeat) is not int) or (repeat < 1):
+        raise Exception("The number of repeats must be an integer >= 1.")
+
+    workloads = {}
+    for name in names:
+        runs = [run_workload_in_process(name) for i in range(repeat)]
+        result = min(runs, key=lambda run: run["seconds"])
+        result["peak_memory"] = max((run["peak_memory"] for run in runs), key=lambda peak: peak or 0)
+        result["spines_per_second"] = result["spines"] / result["seconds"] if result["seconds"] > 0 else None
+        workloads[name] = result
+        if report is not None:
+            report(name, result)
+    machine = {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()}
+    return {"machine": machine, "workloads": workloads}
+
+def compare_results(results, baseline, tolerance=0.1, accept_changed=False):
+    """
+    Compares benchmark results with a baseline
+    Parameters:
+        results: results from run_benchmarks
+        baseline: earlier results from run_benchmarks
+        tolerance: a number, how much slower or bigger (as a fraction, 0.1 is 10%) a workload can be before it fails
+        accept_changed: True to let workloads whose number of nodes changed pass (i.e. when the baseline is
+                        being updated on purpose)
+    Returns:
+        (rows, passed) where rows is a list of dicts with the "name", the "ratio" of the new time to the
+        baseline time, the "memory_ratio", the "status" ("faster", "slower", "more memory", "same" or "new")
+        and whether the number of nodes "changed" for each workload, and passed is False if any workload is
+        slower or uses more memory, or (unless accept_changed) did a different amount of work
+    """
+    rows = []
+    passed = True
+    for name, result in results["workloads"].items():
+        old = baseline["workloads"].get(name)
+        if old is None or old["seconds"] <= 0:
+            rows.append({"name": name, "ratio": None, "memory_ratio": None, "status": "new", "changed": False})
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        memory_ratio = None
+        if result["peak_memory"] and old["peak_memory"]:
+            memory_ratio = result["peak_memory"] / old["peak_memory"]
+        # the tolerance applies whatever the number of nodes, so a change to the search cannot hide a slowdown
+        if ratio > 1 + tolerance:
+            status = "slower"
+            passed = False
+        elif memory_ratio is not None and memory_ratio > 1 + tolerance:
+            status = "more memory"
+            passed = False
+        elif ratio < 1 - tolerance:
+            status = "faster"
+        else:
+            status = "same"
+        # a different number of nodes means the work itself changed, which has to be accepted on purpose
+        changed = result["nodes"] != old["nodes"]
+        if changed and not accept_changed:
+            passed = False
+        rows.append({"name": name, "ratio": ratio, "memory_ratio": memory_ratio, "status": status, "changed": changed})
+    return rows, passed
+
+def update_baseline(baseline, results):
+    # the results replace the baseline workloads they ran, the others are kept
+    if baseline is None:
+        return results
+    workloads = dict(baseline["workloads"])
+    workloads.update(results["workloads"])
+    return {"machine": results["machine"], "workloads": workloads}
+
+def load_results(path):
+    with open(path, "r") as results_file:
+        return json.load(results_file)
+
+def save_results(path, results):
+    with open(path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+        results_file.write("\n")
+
+def format_result(name, result):
+    # one line of the table printed while the benchmarks run
+    rate = "-" if result["spines_per_second"] is None else format(result["spines_per_second"], ",.0f")
+    memory = "-" if result["peak_memory"] is None else format(result["peak_memory"] / 1024, ".1f") + " MB"
+    return (name.ljust(26) + format(result["seconds"], ".3f").rjust(9) + " s" + rate.rjust(14) + " spines/s"
+            + format(result["nodes"], ",").rjust(14) + " nodes" + memory.rjust(12))
+
+def format_comparison(row):
+    if row["ratio"] is None:
+        return row["name"].ljust(26) + "       new"
+    memory = "" if row["memory_ratio"] is None else "   memory x" + format(row["memory_ratio"], ".2f")
+    changed = "   nodes changed" if row["changed"] else ""
+    return row["name"].ljust(26) + format(row["ratio"], ".2f").rjust(8) + "x time   " + row["status"] + memory + changed
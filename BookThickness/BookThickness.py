@@ -7,19 +7,48 @@ It is used in SimpleGraph to see what the book thickness of a graph is, and give
 embedding once it finds it.
 """
 
+import collections
 import copy
+import itertools
+import multiprocessing
 import BookThickness.Permutations as Perms
+import BookThickness.Prefilter as Prefilter
+from BookThickness.EmbeddingState import SpineContext, EmbeddingState
+from BookThickness.CrossingTables import get_crossing_table, get_pair_index
+from BookThickness.ConflictGraph import find_coloring
+from BookThickness.SatEncoding import BookEmbeddingEncoding
+from BookThickness.PrefixSearch import PrefixSearch
+from BookThickness.SearchStats import SearchStats, SearchTimeout
+
+# the ways a single spine can be searched, see find_n_page_embedding_with_spine
+SPINE_METHODS = ("bfs", "coloring", "dfs")
+# method "sat" searches the spine order and the pages together instead, see find_n_page_embedding_sat,
+# and method "incremental" sweeps the spines in an order where each one only swaps two neighbouring
+# vertices of the last one, see find_n_page_embedding_incremental, and method "prefix" builds the spine
+# one vertex at a time and cuts off every prefix that already needs too many pages, see PrefixSearch.py
+SEARCH_METHODS = SPINE_METHODS + ("sat", "incremental", "prefix")
 
 class BookEmbedding():
 
-    def __init__(self, n, edges, spine):
+    def __init__(self, n, edges, spine, track_available=True):
+        # track_available=False skips the lists of available edges, which are only needed while edges are
+        # placed one at a time with place_edge (see embedding_from_pages)
         self.verts = len(spine)
         self.spine = spine
         self.addedEdges = []
         self.remaining_edges = edges
         self.availableEdges = []
         self.numPages = n
-        self.generate_all_possible_edges()
+        self.positions = {}
+        for i in range(len(spine)):
+            self.positions[spine[i]] = i
+        # set by SimpleGraph when the search started from a lower bound, see Bounds.py
+        self.lowerBound = None
+        self.isBoundTight = None
+        # True when a time limit stopped the search first, so a book with fewer pages may still exist
+        self.isUpperBound = False
+        if track_available:
+            self.generate_all_possible_edges()
 
     def is_possible_to_embedd(self):
         possible = True
@@ -131,29 +160,18 @@ class BookEmbedding():
         edge = placed_edge[0]
         page_number = placed_edge[1]
 
-        smaller = self.spine.index(edge[0])
-        larger = self.spine.index(edge[1])
-        if smaller > larger:
-            temp = smaller
-            smaller = larger
-            larger = temp
-
-        if larger == smaller + 1:
-            return
-
-        blocked_vertices = [vert for vert in range(smaller + 1, larger)]
-        for i in range(len(blocked_vertices)):
-            blocked_vertices[i] = self.spine[blocked_vertices[i]]
-        
-        ignored_vertices = [self.spine[smaller], self.spine[larger]] + blocked_vertices
-        blocked_top_vertices = [i for i in self.spine if i not in ignored_vertices]
-
-        for block in blocked_vertices:
-            for vert in blocked_top_vertices:
-                if vert < block:
-                    self.remove_typed_edge(((vert, block), page_number))
-                else:
-                    self.remove_typed_edge(((block, vert), page_number))
+        # the edges blocked on this page are the ones crossing it, read off the crossing table for the spine length
+        table = get_crossing_table(self.verts)
+        smaller = min(self.positions[edge[0]], self.positions[edge[1]])
+        larger = max(self.positions[edge[0]], self.positions[edge[1]])
+        for pair_index in table.get_crossing_pairs(get_pair_index(smaller, larger, self.verts)):
+            p, q = table.pairs[pair_index]
+            block = self.spine[p]
+            vert = self.spine[q]
+            if vert < block:
+                self.remove_typed_edge(((vert, block), page_number))
+            else:
+                self.remove_typed_edge(((block, vert), page_number))
 
     def get_available_edges(self, edge):
         edges = []
@@ -166,91 +184,577 @@ class BookEmbedding():
         graph2 = copy.deepcopy(self)
         return graph2
 
-def find_book_embedding(n, edges):
+def get_num_vertices(edges):
     highest_vertex_number = 0
     for edge in edges:
         if edge[0] > highest_vertex_number:
             highest_vertex_number = edge[0]
         if edge[1] > highest_vertex_number:
             highest_vertex_number = edge[1]
-    num_vertices = highest_vertex_number
-    spines = Perms.get_spines(num_vertices)
-    
-    counter = 0
-    num_perms = len(spines)
-    backspaces = ""
-
+    return highest_vertex_number
+
+def find_book_embedding(n, edges, workers=1, method="bfs", make_spines=None, checkpoint=None, upper_bound=None,
+                        stats=None, prefilter=False):
+    # make_spines can be a function returning a new iterable of spines to search for each page count,
+    # otherwise every spine is searched
+    # checkpoint can be a Checkpoint (see Checkpoint.py) to save the progress to and resume it from
+    # upper_bound can be a BookEmbedding that is already known (i.e. from Heuristic.py), it is returned
+    # as soon as the search gets to its number of pages instead of searching that page count
+    # stats can be a SearchStats (see SearchStats.py) to count the work done and report the progress to
+    # prefilter can be True to rule out spines in blocks with Prefilter.py before they are searched
+    if len(edges) == 0:
+        # there are no spines to search, so the loop below would never end
+        return BookEmbedding(n, [], [])
     num_pages = n
+    if checkpoint is not None:
+        num_pages = checkpoint.get_pages(n)
     while (True):
-        print("Testing for " + str(num_pages) + "-page embeddings...")
-
-        for spine in spines:
-            progress_message = backspaces + "Graphs Completed: " + str(counter) + " / " + str(num_perms)
-            print(progress_message, end="", flush=True)
-            backspaces = len(progress_message) * "\b"
+        if upper_bound is not None and num_pages >= upper_bound.numPages:
+            return embedding_from_pages(num_pages, edges, upper_bound.spine, dict(upper_bound.addedEdges))
+        spines = None if make_spines is None else make_spines()
+        graph = find_n_page_embedding(num_pages, edges, spines, workers, method, checkpoint=checkpoint, stats=stats,
+                                      prefilter=prefilter)
+        if graph != -1:
+            return graph
+        num_pages += 1
 
-            newEdgeSet = edges.copy()
-            graph = find_n_page_embedding_with_spine(num_pages, newEdgeSet, spine)
+def find_minimum_page_embedding(edges, lower_bound=1, spines=None, checkpoint=None, upper_bound=None, stats=None,
+                                prefilter=False):
+    """
+    Finds an embedding with the fewest pages while going through the spines only once
+    Parameters:
+        edges: a list of the edges of the graph
+        lower_bound: an integer, a number of pages the graph is known to need, the search stops as soon as
+                     a spine reaches it
+        spines: an iterable of spines to search, or None for every spine
+        checkpoint: a Checkpoint (see Checkpoint.py) to save the progress to and resume it from, or None
+        upper_bound: a BookEmbedding that is already known (i.e. from Heuristic.py), or None, only spines that
+                     need fewer pages than it are kept
+        stats: a SearchStats (see SearchStats.py) to count the work done and report the progress to, or None
+               if its deadline passes, the best embedding so far is returned with isUpperBound set
+        prefilter: True to work out a lower bound for each spine in blocks with Prefilter.py, so spines that
+                   cannot beat the best one so far are skipped without being searched
+    Returns:
+        book_embedding: a BookEmbedding with the fewest pages any of the spines needs, or -1 if there are no edges
+                        if every spine was searched, book_embedding.numPages is the book thickness
+    """
+    if len(edges) == 0:
+        return -1
+    if stats is None:
+        stats = SearchStats()
+    # any edge needs a page, and find_coloring always puts an edge that crosses nothing on page 1
+    lower_bound = max(lower_bound, 1)
+    num_vertices = get_num_vertices(edges)
+    if spines == None:
+        spines = Perms.iter_spines(num_vertices)
+        num_perms = Perms.count_spines(num_vertices)
+    elif type(spines) is list:
+        num_perms = len(spines)
+    else:
+        num_perms = "?"
+
+    best_pages = None
+    best = None
+    counter = 0
+    if upper_bound is not None:
+        best_pages = upper_bound.numPages
+        best = (list(upper_bound.spine), dict(upper_bound.addedEdges))
+
+    if checkpoint is not None:
+        counter = checkpoint.get_rank(lower_bound)
+        spines = itertools.islice(spines, counter, None)
+        saved = checkpoint.get_best()
+        if saved is not None and (best_pages is None or saved[0] < best_pages):
+            best_pages = saved[0]
+            best = (saved[1], saved[2])
+    if best_pages is not None and best_pages <= lower_bound:
+        spines = []
+    if prefilter:
+        spines = Prefilter.iter_spine_bounds(edges, spines)
+    else:
+        spines = ((spine, 0) for spine in spines)
+
+    stats.start_sweep("Testing spines for the fewest pages...", lower_bound, num_perms, counter)
+    stats.best_pages = best_pages
+    # the spines before the one being searched, the checkpoint is left there if the deadline passes part way
+    finished = counter
+    try:
+        for spine, spine_bound in spines:
+            finished = counter
+            stats.spine_done()
             counter += 1
-            if graph == -1:
+            if best_pages is not None and spine_bound >= best_pages:
+                stats.spines_prefiltered += 1
+                if checkpoint is not None:
+                    checkpoint.update(lower_bound, counter)
                 continue
-            else:
-                print()
-                return graph
 
-        print()
-        counter = 0
-        num_pages += 1
+            # a spine only matters if it needs fewer pages than the best one so far, so that is the only question asked
+            context = SpineContext(edges, spine)
+            num_pages = max(lower_bound, spine_bound) if best_pages is None else best_pages - 1
+            colors = find_coloring(context.crossings, num_pages, stats)[0]
+            if best_pages is None:
+                while colors is None:
+                    num_pages += 1
+                    colors = find_coloring(context.crossings, num_pages, stats)[0]
+            elif colors is None:
+                if checkpoint is not None:
+                    checkpoint.update(lower_bound, counter)
+                continue
+
+            # see how far below the best this spine goes
+            while num_pages > lower_bound:
+                fewer_colors = find_coloring(context.crossings, num_pages - 1, stats)[0]
+                if fewer_colors is None:
+                    break
+                colors = fewer_colors
+                num_pages -= 1
+
+            best_pages = num_pages
+            stats.best_pages = best_pages
+            best = (list(spine), dict(zip(context.edges, colors)))
+            if checkpoint is not None:
+                checkpoint.update(lower_bound, counter)
+                checkpoint.save_best(best_pages, best[0], best[1])
+            if best_pages <= lower_bound:
+                break
+    except SearchTimeout:
+        if best is None:
+            raise
+        stats.end_sweep()
+        if checkpoint is not None:
+            checkpoint.update(lower_bound, finished, force=True)
+        book_embedding = embedding_from_pages(best_pages, edges, best[0], best[1])
+        book_embedding.isUpperBound = True
+        return book_embedding
+
+    stats.end_sweep()
+    if checkpoint is not None:
+        checkpoint.update(lower_bound, counter, force=True)
+    if best is None:
+        return -1
+    return embedding_from_pages(best_pages, edges, best[0], best[1])
+
+def find_n_page_embedding(n, edges, spines, workers=1, method="bfs", dimacs=None, checkpoint=None, stats=None,
+                          prefilter=False):
+    # checkpoint can be a Checkpoint (see Checkpoint.py) to save the progress to and resume it from,
+    # the order of the spines is only fixed for the spine methods and "incremental"
+    # stats can be a SearchStats (see SearchStats.py) to count the work done and report the progress to,
+    # by default the progress is printed
+    # prefilter can be True to rule out spines in blocks with Prefilter.py before they are searched, it only
+    # applies to the spine methods, and the spines ruled out are still counted so checkpoints can be resumed
+    if stats is None:
+        stats = SearchStats()
+    if n < 1 and len(edges) > 0:
+        # every method places the edges that cross nothing on page 1, so a graph with edges is turned away here
+        return -1
+    if checkpoint is not None:
+        saved = checkpoint.get_best()
+        if saved is not None and saved[0] == n:
+            return embedding_from_pages(n, edges, saved[1], saved[2])
+
+    if method == "sat":
+        return find_n_page_embedding_sat(n, edges, spines, dimacs, stats)
+    if method == "incremental" or method == "prefix":
+        if spines == None and method == "incremental":
+            return find_n_page_embedding_incremental(n, edges, checkpoint, stats)
+        if spines == None:
+            return find_n_page_embedding_prefix(n, edges, stats)
+        # given spines are not neighbours of each other or prefixes of a search, so they are coloured one at a time
+        method = "coloring"
 
-def find_n_page_embedding(n, edges, spines):
     if spines == None:
-        # create permutations
-        pass
-    
-    counter = 0
-    num_perms = len(spines)
-    backspaces = ""
+        num_vertices = get_num_vertices(edges)
+        spines = Perms.iter_spines(num_vertices)
+        num_perms = Perms.count_spines(num_vertices)
+    elif type(spines) is list:
+        num_perms = len(spines)
+    else:
+        # a generator of spines, the total is not known ahead of time
+        num_perms = "?"
 
-    print("Testing for " + str(n) + "-page embeddings...")
+    counter = 0
+    if checkpoint is not None:
+        # the spines before the saved rank were already tested
+        counter = checkpoint.get_rank(n)
+        spines = itertools.islice(spines, counter, None)
+
+    if workers > 1:
+        return find_n_page_embedding_parallel(n, edges, spines, num_perms, workers, method, checkpoint=checkpoint,
+                                              counter=counter, stats=stats, prefilter=prefilter)
+
+    if prefilter:
+        spines = Prefilter.filter_spines(n, edges, spines)
+    stats.start_sweep("Testing for " + str(n) + "-page embeddings...", n, num_perms, counter)
     for spine in spines:
-        progress_message = backspaces + "Graphs Completed: " + str(counter) + " / " + str(num_perms)
-        print(progress_message, end="", flush=True)
-        backspaces = len(progress_message) * "\b"
-
+        if spine is None:
+            # ruled out by the prefilter
+            counter += 1
+            stats.spine_done()
+            stats.spines_prefiltered += 1
+            if checkpoint is not None:
+                checkpoint.update(n, counter)
+            continue
         newEdgeSet = edges.copy()
-        graph = find_n_page_embedding_with_spine(n, newEdgeSet, spine)
+        graph = find_n_page_embedding_with_spine(n, newEdgeSet, spine, method, stats)
         counter += 1
+        stats.spine_done()
         if graph == -1:
+            if checkpoint is not None:
+                checkpoint.update(n, counter)
             continue
         else:
-            print()
+            stats.end_sweep()
+            if checkpoint is not None:
+                checkpoint.update(n, counter)
+                checkpoint.save_best(n, graph.spine, dict(graph.addedEdges))
             return graph
-    
-    print()
+
+    stats.end_sweep()
+    if checkpoint is not None:
+        checkpoint.update(n, counter, force=True)
     return -1
 
-def find_n_page_embedding_with_spine(n, edges, spine):
-    edges = edges.copy()
-    first_embedding = BookEmbedding(n, edges, spine)
-    first_embedding.place_free_edges()
-    embeddings = [first_embedding]
-
-    while len(embeddings) > 0:
-        new_embeddings = []
-        for embedding in embeddings:
-            if embedding.is_graph_placed():
-                return embedding
-            if not embedding.is_possible_to_embedd():
-                continue
-            
-            next_edge = embedding.remaining_edges[0]
-            avail_edges = embedding.get_available_edges(next_edge)
+def find_n_page_embedding_incremental(n, edges, checkpoint=None, stats=None):
+    # the conflict graph is updated for each adjacent swap instead of being rebuilt, and when a spine fails
+    # the set of edges that made it fail is kept: while no crossing inside that set changes, the following
+    # spines fail for the same reason and are skipped without colouring
+    num_vertices = get_num_vertices(edges)
+    num_perms = Perms.count_spines(num_vertices)
+    context = None
+    obstruction = None
+    counter = 0
+    if stats is None:
+        stats = SearchStats()
+    # the spines are always swept in the same order, so the ones up to the saved rank only update the crossings
+    start = 0
+    if checkpoint is not None:
+        start = checkpoint.get_rank(n)
+
+    stats.start_sweep("Testing for " + str(n) + "-page embeddings...", n, num_perms, start)
+    for spine, swapped in Perms.iter_adjacent_transposition_spines(num_vertices):
+        if context is None:
+            context = SpineContext(edges, spine)
+        else:
+            for e, f in context.swap_adjacent(swapped):
+                if obstruction is not None and (obstruction >> e) & 1 and (obstruction >> f) & 1:
+                    obstruction = None
 
-            for edge in avail_edges:
-                new_embedding = embedding.copy()
-                new_embedding.place_edge(edge[0][0], edge[0][1], edge[1])
-                new_embeddings.append(new_embedding)
-        embeddings = new_embeddings
+        # the flip of this spine is searched instead
+        if num_vertices >= 3 and spine[1] > spine[-1]:
+            continue
 
+        counter += 1
+        if counter <= start:
+            continue
+        stats.spine_done()
+        if obstruction is not None:
+            # the crossings that ruled out an earlier spine are all still here, so this spine fails too
+            if checkpoint is not None:
+                checkpoint.update(n, counter)
+            continue
+        colors, obstruction = find_coloring(context.crossings, n, stats)
+        if checkpoint is not None:
+            checkpoint.update(n, counter)
+        if colors is not None:
+            stats.end_sweep()
+            pages = dict(zip(context.edges, colors))
+            if checkpoint is not None:
+                checkpoint.save_best(n, spine, pages)
+            return embedding_from_pages(n, edges, spine, pages)
+
+    stats.end_sweep()
+    if checkpoint is not None:
+        checkpoint.update(n, counter, force=True)
     return -1
-            
\ No newline at end of file
+
+def find_n_page_embedding_prefix(n, edges, stats=None):
+    if stats is None:
+        stats = SearchStats()
+    stats.message("Testing for " + str(n) + "-page embeddings on spine prefixes...")
+    search = PrefixSearch(n, edges, get_num_vertices(edges))
+    solution = search.search()
+    stats.add_nodes(search.nodes_expanded, search.nodes_pruned)
+    stats.message("Prefixes Expanded: " + str(search.nodes_expanded) + ", Pruned: " + str(search.nodes_pruned))
+    if solution is None:
+        return -1
+    spine, pages = solution
+    return embedding_from_pages(n, edges, spine, pages)
+
+def find_n_page_embedding_sat(n, edges, spines, dimacs=None, stats=None):
+    # one CNF formula per given spine, or a single formula covering every spine order if spines is None
+    # dimacs gives a file to write the (last) formula to, so it can also be given to an outside solver
+    vertices = list(range(1, get_num_vertices(edges) + 1))
+    if spines == None:
+        spines = [None]
+    if stats is None:
+        stats = SearchStats()
+
+    stats.message("Testing for " + str(n) + "-page embeddings with a SAT solver...")
+    for spine in spines:
+        encoding = BookEmbeddingEncoding(n, edges, vertices, spine)
+        if dimacs is not None:
+            encoding.write_dimacs(dimacs)
+        solution = encoding.solve()
+        if spine is not None:
+            stats.spine_done()
+        if solution is not None:
+            sat_spine, pages = solution
+            return embedding_from_pages(n, edges, sat_spine, pages)
+    return -1
+
+# set in every worker process of the pool, tells the workers to stop once an embedding is found
+cancel_event = None
+
+def init_search_worker(event):
+    global cancel_event
+    cancel_event = event
+
+def search_spine_chunk(n, edges, spines, method, prefilter=False):
+    # returns the embedding found in this chunk, or the number of spines tested if there was none
+    counter = 0
+    if prefilter:
+        spines = Prefilter.filter_spines(n, edges, spines)
+    for spine in spines:
+        if cancel_event.is_set():
+            break
+        if spine is None:
+            counter += 1
+            continue
+        graph = find_n_page_embedding_with_spine(n, edges.copy(), spine, method)
+        counter += 1
+        if graph != -1:
+            cancel_event.set()
+            return graph
+    return counter
+
+def chunk_spines(spines, chunk_size):
+    spines = iter(spines)
+    while (True):
+        chunk = list(itertools.islice(spines, chunk_size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+def find_n_page_embedding_parallel(n, edges, spines, num_perms, workers, method="bfs", chunk_size=256, checkpoint=None,
+                                   counter=0, stats=None, prefilter=False):
+    # chunks of spines are handed to a pool of processes, only a few chunks are queued at a time so the
+    # spine generator is never expanded in memory
+    # the chunks are collected in the order they were handed out, so counter is always the rank of the
+    # first spine that has not been tested yet, which is what is saved to the checkpoint
+    # the workers are other processes, so only the spines tested are added to stats, not the nodes
+    # with prefilter each worker runs Prefilter.py on its own chunk
+    if stats is None:
+        stats = SearchStats()
+    event = multiprocessing.Event()
+    chunks = chunk_spines(spines, chunk_size)
+
+    stats.start_sweep("Testing for " + str(n) + "-page embeddings on " + str(workers) + " processes...", n, num_perms,
+                      counter)
+    with multiprocessing.Pool(workers, init_search_worker, (event,)) as pool:
+        pending = collections.deque()
+        for chunk in itertools.islice(chunks, 2 * workers):
+            pending.append(pool.apply_async(search_spine_chunk, (n, edges, chunk, method, prefilter)))
+
+        while len(pending) > 0:
+            result = pending.popleft().get()
+            if type(result) is BookEmbedding:
+                pool.terminate()
+                stats.end_sweep()
+                if checkpoint is not None:
+                    checkpoint.save_best(n, result.spine, dict(result.addedEdges))
+                return result
+
+            counter += result
+            stats.spine_done(result)
+            # once an embedding is found the chunks still running stop part way, so their counts are not ranks
+            if checkpoint is not None and not event.is_set():
+                checkpoint.update(n, counter)
+
+            # once a worker has found an embedding, the remaining chunks only need to be collected
+            if not event.is_set():
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(pool.apply_async(search_spine_chunk, (n, edges, chunk, method, prefilter)))
+
+    stats.end_sweep()
+    if checkpoint is not None:
+        checkpoint.update(n, counter, force=True)
+    return -1
+
+def find_n_page_embedding_with_spine(n, edges, spine, method="bfs", stats=None):
+    # method "bfs" places the edges one at a time, keeping every partial embedding of a level,
+    # method "coloring" colours the conflict graph of the spine directly (see ConflictGraph.py),
+    # method "dfs" places the edges one at a time like "bfs", but keeps a single partial embedding and
+    # backtracks (see find_pages_depth_first)
+    # stats can be a SearchStats, the partial embeddings expanded and pruned and the copies made are added to it
+    if n < 1 and len(edges) > 0:
+        return -1
+    context = SpineContext(edges, spine)
+    if method == "coloring":
+        colors = find_coloring(context.crossings, n, stats)[0]
+        if colors is None:
+            return -1
+        return embedding_from_pages(n, edges, spine, dict(zip(context.edges, colors)))
+    if method == "dfs":
+        pages = find_pages_depth_first(context, n, stats)
+        if pages is None:
+            return -1
+        return embedding_from_pages(n, edges, spine, pages)
+
+    first_state = EmbeddingState(context, n)
+    first_state.place_free_edges()
+    states = [first_state]
+    # counted here and added to stats once, so the loop does not look stats up for every state
+    expanded = 0
+    pruned = 0
+    copies = 0
+
+    embedding = -1
+    while len(states) > 0 and embedding == -1:
+        new_states = []
+        for state in states:
+            if state.is_graph_placed():
+                embedding = embedding_from_pages(n, edges, spine, state.get_page_assignment())
+                break
+            if not state.is_possible_to_embedd():
+                pruned += 1
+                continue
+
+            expanded += 1
+            if stats is not None and expanded % 4096 == 0:
+                stats.check_deadline()
+            next_edge = state.get_next_edge()
+            for page_number in state.get_available_pages(next_edge):
+                new_state = state.copy()
+                new_state.place_edge(next_edge, page_number)
+                new_states.append(new_state)
+                copies += 1
+        states = new_states
+
+    if stats is not None:
+        stats.add_nodes(expanded, pruned, copies)
+    return embedding
+
+def iter_n_page_embeddings(n, edges, num_vertices, spines=None, symmetry=True):
+    """
+    Generates every n-page embedding of a graph, without keeping any of them
+    Parameters:
+        n: an integer, the number of pages
+        edges: a list of the edges of the graph
+        num_vertices: an integer, the vertices are 1 - num_vertices
+        spines: an iterable of spines to search, or None for every spine (up to flips and rotations)
+        symmetry: True to give each embedding once up to relabelling the pages, False for every labelling
+    Returns:
+        a generator of (spine, pages), spine is a tuple and pages is a tuple with the page number of each edge
+    """
+    if spines == None:
+        spines = Perms.iter_spines(num_vertices)
+    for spine in spines:
+        context = SpineContext(edges, list(spine))
+        spine = tuple(spine)
+        for pages in iter_page_assignments(context, n, symmetry):
+            yield spine, pages
+
+def count_embeddable_spines(n, edges, num_vertices, spines=None):
+    # the number of spines (every spine up to flips and rotations if spines is None) with an n-page embedding
+    if spines == None:
+        spines = Perms.iter_spines(num_vertices)
+    count = 0
+    for spine in spines:
+        if len(edges) == 0:
+            count += 1
+        elif n > 0 and find_coloring(SpineContext(edges, list(spine)).crossings, n)[0] is not None:
+            count += 1
+    return count
+
+def find_pages_depth_first(context, n, stats=None):
+    """
+    Places the edges of a spine one at a time on a single EmbeddingState, taking them back off to backtrack
+    Parameters:
+        context: the SpineContext of the spine
+        n: an integer, the number of pages
+        stats: a SearchStats to add the partial embeddings expanded and pruned to, or None
+    Returns:
+        pages: a dict of edge -> page number, or None if the spine has no n-page embedding
+    """
+    state = EmbeddingState(context, n)
+    state.place_free_edges()
+    for state in iter_placements_depth_first(state, stats=stats):
+        return state.get_page_assignment()
+    return None
+
+def iter_page_assignments(context, n, symmetry=True):
+    """
+    Generates every n-page embedding of a spine
+    Parameters:
+        context: the SpineContext of the spine
+        n: an integer, the number of pages
+        symmetry: True to give each embedding once up to relabelling the pages, False for every labelling
+    Returns:
+        a generator of tuples, the page number of every edge of context.edges (in the same order)
+    """
+    state = EmbeddingState(context, n)
+    for state in iter_placements_depth_first(state, symmetry):
+        yield state.get_page_numbers()
+
+def iter_placements_depth_first(state, symmetry=True, stats=None):
+    # yields state every time all of its edges are placed, and then carries on backtracking from it
+    # stats can be a SearchStats to add the partial embeddings expanded and pruned to
+    # with symmetry=True, an edge can only open the next unused page (the first one goes on page 1), since
+    # the pages are interchangeable and any other new page would give a relabelling of a branch already searched
+    # each level of the stack is (edge index, pages still to try for it, pages opened before it), the edge
+    # of the deepest level is on a page when the trail is as long as the stack
+    stack = []
+    opened = 0
+    while (True):
+        if state.is_graph_placed():
+            yield state
+        elif state.is_possible_to_embedd():
+            if stats is not None:
+                stats.nodes_expanded += 1
+                if stats.nodes_expanded % 4096 == 0:
+                    stats.check_deadline()
+            edge_index = state.get_next_edge()
+            pages = state.get_available_pages(edge_index)
+            if symmetry:
+                pages = [page_number for page_number in pages if page_number <= opened + 1]
+            pages.reverse()
+            stack.append((edge_index, pages, opened))
+        elif stats is not None:
+            stats.nodes_pruned += 1
+
+        # go on with the next page of the deepest level that has one left
+        while (True):
+            if len(stack) == 0:
+                return
+            edge_index, pages, opened = stack[-1]
+            if len(state.trail) == len(stack):
+                state.pop_edge()
+            if len(pages) > 0:
+                page_number = pages.pop()
+                state.push_edge(edge_index, page_number)
+                opened = max(opened, page_number)
+                break
+            stack.pop()
+
+def embedding_from_pages(n, edges, spine, pages):
+    # builds the BookEmbedding for a page assignment (a dict of edge -> page number) that is known to be valid
+    # the edges are put straight on their pages, since going through place_edge checks the available edges
+    # of every page for each edge and is far too slow for large graphs (i.e. from Heuristic.py)
+    embedding = BookEmbedding(n, [], spine, False)
+    edge_set = set(edges)
+    # the edges between neighbours on the spine (and the first and last vertex) go on page 1, as in place_free_edges
+    placed = set()
+    neighbours = [(spine[k], spine[k + 1]) for k in range(len(spine) - 1)]
+    if len(spine) > 0:
+        neighbours.append((spine[0], spine[-1]))
+    for a, b in neighbours:
+        edge = (min(a, b), max(a, b))
+        if edge in edge_set and edge not in placed:
+            embedding.addedEdges.append((edge, 1))
+            placed.add(edge)
+    for edge in edges:
+        if edge not in placed:
+            embedding.addedEdges.append((edge, pages[edge]))
+    return embedding
@@ -0,0 +1,294 @@
+"""Bounds.py
+@author lmartin5
+
+This file contains the lower bounds on the book thickness that are checked before any spines are searched.
+A k-page graph on |V| >= 3 vertices has at most (k + 1)|V| - 3k edges (the spine edges plus |V| - 3 more
+edges on each page), a graph with a clique on w >= 4 vertices needs at least ceil(w / 2) pages, and the
+graphs with book thickness at most 1 and at most 2 are exactly the outerplanar graphs and the subgraphs of
+planar Hamiltonian graphs, so a graph that is not outerplanar needs 2 pages and one that is not planar needs 3.
+Planarity is tested on each biconnected block with the Demoucron, Malgrange and Pertuiset algorithm.
+"""
+
+from BookThickness.Symmetry import get_adjacency
+
+def find_lower_bound(vertices, edges):
+    """
+    Main function for the lower bounds
+    Parameters:
+        vertices: a list of the vertices of the graph
+        edges: a list of the edges of the graph
+    Returns:
+        (bound, reason) where bound is the largest of the lower bounds on the number of pages,
+        and reason is a string saying which bound it came from
+    """
+    if len(edges) == 0:
+        return 0, "no edges"
+    bound = 1
+    reason = "an edge"
+
+    blocks = find_blocks(get_adjacency(vertices, edges))
+    for block_edges in [edges] + blocks:
+        edge_bound = get_edge_count_bound(len(get_block_vertices(block_edges)), len(block_edges))
+        if edge_bound > bound:
+            bound = edge_bound
+            reason = "edge count"
+
+    clique_bound = get_clique_bound(get_clique_number(get_adjacency(vertices, edges)))
+    if clique_bound > bound:
+        bound = clique_bound
+        reason = "largest clique"
+
+    # planarity can only raise the bound to 2 or 3
+    if bound < 3 and not is_planar(vertices, edges, blocks):
+        bound = 3
+        reason = "not planar"
+    elif bound < 2 and not is_outerplanar(vertices, edges):
+        bound = 2
+        reason = "not outerplanar"
+    return bound, reason
+
+def get_edge_count_bound(num_vertices, num_edges):
+    # smallest k with num_edges <= (k + 1) * num_vertices - 3k, which only holds for graphs with 3 or more vertices
+    if num_edges == 0:
+        return 0
+    if num_vertices <= 3:
+        return 1
+    k = 1
+    while num_edges > (k + 1) * num_vertices - 3 * k:
+        k += 1
+    return k
+
+def get_clique_bound(clique_number):
+    # K_w has book thickness ceil(w / 2) for w >= 4, triangles and single edges fit on one page
+    if clique_number >= 4:
+        return (clique_number + 1) // 2
+    if clique_number >= 2:
+        return 1
+    return 0
+
+def get_clique_number(adjacency):
+    return bron_kerbosch(adjacency, 0, set(adjacency), set())
+
+def bron_kerbosch(adjacency, size, candidates, excluded):
+    # size of the largest clique that extends a clique of the given size with vertices from candidates
+    if len(candidates) == 0:
+        return size
+    pivot = max(candidates | excluded, key=lambda vert: len(adjacency[vert] & candidates))
+    largest = size
+    for vert in sorted(candidates - adjacency[pivot]):
+        if size + len(candidates) <= largest:
+            break
+        largest = max(largest, bron_kerbosch(adjacency, size + 1, candidates & adjacency[vert], excluded & adjacency[vert]))
+        candidates.remove(vert)
+        excluded.add(vert)
+    return largest
+
+def find_blocks(adjacency):
+    """
+    Finds the biconnected blocks of a graph
+    Parameters:
+        adjacency: a dictionary of vertex -> set of neighbouring vertices
+    Returns:
+        blocks: a list of blocks, each one a list of edges (a, b) with a < b
+                a bridge is a block with a single edge, isolated vertices are in no block
+    """
+    depth = {}
+    low = {}
+    blocks = []
+    edge_stack = []
+    for root in sorted(adjacency):
+        if root in depth:
+            continue
+        depth[root] = 0
+        low[root] = 0
+        # depth first search without recursion, each entry is (vertex, parent, neighbours still to visit)
+        stack = [(root, None, iter(sorted(adjacency[root])))]
+        while stack:
+            vert, parent, neighbours = stack[-1]
+            advanced = False
+            for other in neighbours:
+                if other == parent:
+                    continue
+                if other not in depth:
+                    depth[other] = depth[vert] + 1
+                    low[other] = depth[other]
+                    edge_stack.append((vert, other))
+                    stack.append((other, vert, iter(sorted(adjacency[other]))))
+                    advanced = True
+                    break
+                elif depth[other] < depth[vert]:
+                    low[vert] = min(low[vert], depth[other])
+                    edge_stack.append((vert, other))
+            if advanced:
+                continue
+
+            stack.pop()
+            if parent is not None:
+                low[parent] = min(low[parent], low[vert])
+                if low[vert] >= depth[parent]:
+                    # parent separates vert's subtree from the rest, so the edges above (parent, vert) are a block
+                    block = []
+                    while True:
+                        edge = edge_stack.pop()
+                        block.append((min(edge), max(edge)))
+                        if edge == (parent, vert):
+                            break
+                    blocks.append(sorted(block))
+    return blocks
+
+def get_block_vertices(block):
+    block_vertices = set()
+    for edge in block:
+        block_vertices.add(edge[0])
+        block_vertices.add(edge[1])
+    return block_vertices
+
+def is_outerplanar(vertices, edges):
+    # a graph is outerplanar exactly when it stays planar after adding a vertex joined to every vertex
+    apex = max(vertices) + 1
+    apex_edges = list(edges)
+    for vert in vertices:
+        apex_edges.append((vert, apex))
+    return is_planar(vertices + [apex], apex_edges)
+
+def is_planar(vertices, edges, blocks=None):
+    # a graph is planar exactly when all of its biconnected blocks are
+    if len(edges) > 3 * len(vertices) - 6 and len(vertices) >= 3:
+        return False
+    if blocks is None:
+        blocks = find_blocks(get_adjacency(vertices, edges))
+    for block in blocks:
+        if not is_block_planar(block):
+            return False
+    return True
+
+def is_block_planar(block):
+    """
+    Demoucron, Malgrange and Pertuiset planarity test for a biconnected block
+    Parameters:
+        block: a list of the edges of a biconnected graph
+    Returns:
+        True if the block is planar, False if it is not
+    """
+    block_vertices = get_block_vertices(block)
+    # K5 and K3,3 have at least 9 edges and 5 vertices, and a planar graph has at most 3|V| - 6 edges
+    if len(block) < 9 or len(block_vertices) < 5:
+        return True
+    if len(block) > 3 * len(block_vertices) - 6:
+        return False
+    adjacency = get_adjacency(block_vertices, block)
+
+    # start from any cycle, which splits the plane into two faces, each face is a list of its vertices in order
+    cycle = find_cycle(adjacency)
+    faces = [cycle, cycle.copy()]
+    embedded_vertices = set(cycle)
+    embedded_edges = set()
+    for i in range(len(cycle)):
+        embedded_edges.add(frozenset((cycle[i - 1], cycle[i])))
+
+    while (True):
+        fragments = find_fragments(adjacency, block, embedded_vertices, embedded_edges)
+        if len(fragments) == 0:
+            return True
+
+        # a fragment that only fits in one face has to go there, otherwise any fragment can go in any of its faces
+        chosen = None
+        for fragment in fragments:
+            admissible = [face for face in faces if fragment[0] <= set(face)]
+            if len(admissible) == 0:
+                return False
+            if chosen is None or len(admissible) == 1:
+                chosen = (fragment, admissible[0])
+                if len(admissible) == 1:
+                    break
+
+        fragment, face = chosen
+        path = find_fragment_path(adjacency, fragment, embedded_vertices)
+        faces.remove(face)
+        faces += split_face(face, path)
+        for i in range(1, len(path)):
+            embedded_edges.add(frozenset((path[i - 1], path[i])))
+        embedded_vertices.update(path)
+
+def find_cycle(adjacency):
+    # in a biconnected graph any edge (a, b) is on a cycle, found as a shortest path from a to b without that edge
+    a = min(adjacency)
+    b = min(adjacency[a])
+    parent = {a: None}
+    queue = [a]
+    for vert in queue:
+        for other in sorted(adjacency[vert]):
+            if other in parent or (vert == a and other == b):
+                continue
+            parent[other] = vert
+            queue.append(other)
+    cycle = []
+    vert = b
+    while vert is not None:
+        cycle.append(vert)
+        vert = parent[vert]
+    return cycle
+
+def find_fragments(adjacency, block, embedded_vertices, embedded_edges):
+    # a fragment is either an edge that is not embedded between two embedded vertices, or a component of the
+    # vertices that are not embedded, together with the embedded vertices it attaches to
+    # each fragment is (attachments, vertices of the component), the component is empty for a single edge
+    fragments = []
+    for edge in block:
+        if edge[0] in embedded_vertices and edge[1] in embedded_vertices:
+            if frozenset(edge) not in embedded_edges:
+                fragments.append(({edge[0], edge[1]}, set()))
+
+    seen = set()
+    for start in sorted(adjacency):
+        if start in embedded_vertices or start in seen:
+            continue
+        component = {start}
+        attachments = set()
+        queue = [start]
+        for vert in queue:
+            for other in adjacency[vert]:
+                if other in embedded_vertices:
+                    attachments.add(other)
+                elif other not in component:
+                    component.add(other)
+                    queue.append(other)
+        seen |= component
+        fragments.append((attachments, component))
+    return fragments
+
+def find_fragment_path(adjacency, fragment, embedded_vertices):
+    # a path through the fragment between two of its attachments
+    attachments, component = fragment
+    if len(component) == 0:
+        return sorted(attachments)
+    start = min(attachments)
+    parent = {}
+    queue = []
+    for other in sorted(adjacency[start]):
+        if other in component:
+            parent[other] = start
+            queue.append(other)
+    for vert in queue:
+        for other in sorted(adjacency[vert]):
+            if other in component and other not in parent:
+                parent[other] = vert
+                queue.append(other)
+            elif other in embedded_vertices and other != start:
+                path = [other]
+                while vert != start:
+                    path.append(vert)
+                    vert = parent[vert]
+                path.append(start)
+                return path[::-1]
+    raise Exception("A fragment of a biconnected block must have two attachments.")
+
+def split_face(face, path):
+    # the path joins two vertices of the face and splits it into two faces
+    start = face.index(path[0])
+    rotated = face[start:] + face[:start]
+    end = rotated.index(path[-1])
+    interior = path[1:-1]
+    first_face = rotated[:end + 1] + interior[::-1]
+    second_face = rotated[end:] + [rotated[0]] + interior
+    return [first_face, second_face]
@@ -0,0 +1,101 @@
+"""Checkpoint.py
+@author lmartin5
+
+This file contains the Checkpoint class, which saves how far a search has gone to a JSON file so an
+interrupted search can be picked up again. Spines are always searched in the same order, so the position
+of a search is the number of pages it is testing and the rank of the next spine (how many spines of that
+page count were already tested). The best embedding found so far is saved with them. The file is written
+to a temporary file first and then moved over the old one, so an interruption while writing never
+leaves a half written checkpoint behind.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+def load_checkpoint(path):
+    # returns the saved state, or None if there is no checkpoint yet
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as checkpoint_file:
+        return json.load(checkpoint_file)
+
+def save_checkpoint(path, state):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+    try:
+        with os.fdopen(file_descriptor, "w") as checkpoint_file:
+            json.dump(state, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+class Checkpoint():
+
+    def __init__(self, path, edges, search, interval=60):
+        """
+        Opens a checkpoint file, or starts a new one if it does not exist
+        Parameters:
+            path: the path of the JSON checkpoint file
+            edges: a list of the edges of the graph being searched
+            search: a dict of the settings that decide the order of the spines (i.e. the method), a checkpoint
+                    can only be resumed with the same graph and settings
+            interval: the number of seconds between writes while the search is running
+        """
+        self.path = path
+        self.interval = interval
+        edge_list = [list(edge) for edge in edges]
+
+        self.state = load_checkpoint(path)
+        if self.state is None:
+            self.state = {"edges": edge_list, "search": search, "pages": None, "rank": 0, "best": None}
+        elif self.state["edges"] != edge_list:
+            raise Exception("The checkpoint " + str(path) + " is for a different graph.")
+        elif self.state["search"] != search:
+            raise Exception("The checkpoint " + str(path) + " was made with different search settings.")
+        self.last_write = time.monotonic()
+
+    def get_pages(self, n):
+        # the page count to start from, page counts below the saved one are already known to fail
+        if self.state["pages"] is None:
+            return n
+        return max(n, self.state["pages"])
+
+    def get_rank(self, n):
+        # the number of spines of the n-page search that were already tested
+        if self.state["pages"] == n:
+            return self.state["rank"]
+        return 0
+
+    def get_best(self):
+        # (number of pages, spine, dict of edge -> page number) of the best embedding saved, or None
+        best = self.state["best"]
+        if best is None:
+            return None
+        pages = {}
+        for a, b, page_number in best["assignment"]:
+            pages[(a, b)] = page_number
+        return best["pages"], best["spine"], pages
+
+    def update(self, n, rank, force=False):
+        self.state["pages"] = n
+        self.state["rank"] = rank
+        if force or time.monotonic() - self.last_write >= self.interval:
+            self.save()
+
+    def save_best(self, n, spine, pages):
+        assignment = []
+        for edge in pages:
+            assignment.append([edge[0], edge[1], pages[edge]])
+        self.state["best"] = {"pages": n, "spine": list(spine), "assignment": assignment}
+        self.save()
+
+    def save(self):
+        save_checkpoint(self.path, self.state)
+        self.last_write = time.monotonic()
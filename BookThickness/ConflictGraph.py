@@ -0,0 +1,208 @@
+"""ConflictGraph.py
+@author lmartin5
+
+This file contains the functions that decide the page assignment for a fixed spine by colouring
+its conflict graph. The vertices of the conflict graph are the edges of the graph, and two of them
+are adjacent when their endpoints interleave on the spine, so an n-page embedding with that spine is
+exactly an n-colouring of the conflict graph. The conflict graph is given as the list of crossing
+bitmasks built by SpineContext in EmbeddingState.py.
+"""
+
+def find_coloring(crossings, n, stats=None):
+    """
+    Colours a conflict graph, or explains why it cannot be coloured
+    Parameters:
+        crossings: a list of integers, bit j of crossings[i] is set when edge i and edge j cross
+        n: an integer, the number of pages (colours) that can be used
+        stats: a SearchStats to add the steps of the backtracking search to, or None
+    Returns:
+        (colors, None) with the page number of every edge if n pages are enough, otherwise
+        (None, obstruction) where obstruction is a bitmask of edges whose conflict graph on its own
+        already needs more than n colours (a crossing pair, an odd cycle or a whole component)
+    """
+    if n < 1 and len(crossings) > 0:
+        # with no pages even a single edge has nowhere to go
+        return None, 1
+    colors = [0] * len(crossings)
+    for component in find_components(crossings):
+        if component & (component - 1) == 0:
+            # an edge that crosses nothing can always go on page 1
+            colors[component.bit_length() - 1] = 1
+        elif n < 2:
+            vertex = (component & -component).bit_length() - 1
+            return None, (1 << vertex) | (crossings[vertex] & -crossings[vertex])
+        elif n == 2:
+            odd_cycle = two_color_component(crossings, component, colors)
+            if odd_cycle:
+                return None, odd_cycle
+        else:
+            if not dsatur_color_component(crossings, component, n, colors, stats):
+                return None, component
+    return colors, None
+
+def greedy_color(crossings):
+    """
+    Colours a conflict graph with DSATUR without backtracking, so it is fast but may use more colours than needed
+    Parameters:
+        crossings: a list of integers, bit j of crossings[i] is set when edge i and edge j cross
+    Returns:
+        (colors, num_colors) where colors is a list with the page number of every edge
+    """
+    colors = [0] * len(crossings)
+    # seen[i] is the set of colours next to edge i
+    seen = [set() for i in range(len(crossings))]
+    uncolored = set(range(len(crossings)))
+    # ties are broken by the number of crossings, worked out once instead of at every step
+    degrees = [bin(crossing).count("1") for crossing in crossings]
+    num_colors = 0
+    while len(uncolored) > 0:
+        vertex = max(uncolored, key=lambda i: (len(seen[i]), degrees[i]))
+        color = 1
+        while color in seen[vertex]:
+            color += 1
+        colors[vertex] = color
+        num_colors = max(num_colors, color)
+        uncolored.remove(vertex)
+
+        neighbours = crossings[vertex]
+        while neighbours:
+            low_bit = neighbours & -neighbours
+            neighbours ^= low_bit
+            seen[low_bit.bit_length() - 1].add(color)
+    return colors, num_colors
+
+def find_components(crossings):
+    components = []
+    unseen = (1 << len(crossings)) - 1
+    while unseen:
+        frontier = unseen & -unseen
+        component = frontier
+        while frontier:
+            low_bit = frontier & -frontier
+            frontier ^= low_bit
+            new_vertices = crossings[low_bit.bit_length() - 1] & ~component
+            component |= new_vertices
+            frontier |= new_vertices
+        unseen &= ~component
+        components.append(component)
+    return components
+
+def two_color_component(crossings, component, colors):
+    # breadth first search, the component is bipartite exactly when no edge joins two vertices of the same
+    # colour, returns 0 if it is and the bitmask of an odd cycle if it is not
+    start = (component & -component).bit_length() - 1
+    colors[start] = 1
+    parent = {start: None}
+    queue = [start]
+    for vertex in queue:
+        other_color = 3 - colors[vertex]
+        neighbours = crossings[vertex]
+        while neighbours:
+            low_bit = neighbours & -neighbours
+            neighbours ^= low_bit
+            neighbour = low_bit.bit_length() - 1
+            if colors[neighbour] == 0:
+                colors[neighbour] = other_color
+                parent[neighbour] = vertex
+                queue.append(neighbour)
+            elif colors[neighbour] != other_color:
+                return get_odd_cycle(parent, vertex, neighbour)
+    return 0
+
+def get_odd_cycle(parent, a, b):
+    # a and b are adjacent and at the same depth parity, the cycle is both tree paths up to where they meet
+    path_a = []
+    while a is not None:
+        path_a.append(a)
+        a = parent[a]
+    on_path_a = set(path_a)
+    cycle = 0
+    while b not in on_path_a:
+        cycle |= 1 << b
+        b = parent[b]
+    for vertex in path_a:
+        cycle |= 1 << vertex
+        if vertex == b:
+            break
+    return cycle
+
+def dsatur_color_component(crossings, component, n, colors, stats=None):
+    # color_classes[c] is the bitmask of the vertices that have colour c + 1
+    color_classes = [0] * n
+    if dsatur_backtrack(crossings, component, n, color_classes, 0, stats):
+        for c in range(n):
+            members = color_classes[c]
+            while members:
+                low_bit = members & -members
+                members ^= low_bit
+                colors[low_bit.bit_length() - 1] = c + 1
+        return True
+    return False
+
+def dsatur_backtrack(crossings, uncolored, n, color_classes, num_used, stats=None):
+    # a depth first search over the vertices in DSATUR order, kept on an explicit stack instead of recursion
+    # so that graphs with thousands of edges do not run into Python's recursion limit
+    # each frame is [bit of the vertex, colours it can take, index of the next colour, colour it has now,
+    # number of colours used before it], the colour it has now is taken back off before the next one is tried
+    stack = []
+    descend = True
+    while (True):
+        if descend:
+            if uncolored == 0:
+                return True
+            if stats is not None:
+                stats.nodes_expanded += 1
+                if stats.nodes_expanded % 4096 == 0:
+                    stats.check_deadline()
+            vertex = select_dsatur_vertex(crossings, uncolored, n, color_classes, num_used)
+            if vertex == -1:
+                if stats is not None:
+                    stats.nodes_pruned += 1
+            else:
+                neighbours = crossings[vertex]
+                # colours are interchangeable, so an unused colour is only ever tried once
+                candidates = [c for c in range(min(num_used + 1, n)) if not neighbours & color_classes[c]]
+                stack.append([1 << vertex, candidates, 0, -1, num_used])
+            descend = False
+
+        if len(stack) == 0:
+            return False
+        frame = stack[-1]
+        bit = frame[0]
+        if frame[3] >= 0:
+            color_classes[frame[3]] &= ~bit
+            uncolored |= bit
+            num_used = frame[4]
+        if frame[2] == len(frame[1]):
+            stack.pop()
+            continue
+        c = frame[1][frame[2]]
+        frame[2] += 1
+        frame[3] = c
+        color_classes[c] |= bit
+        uncolored &= ~bit
+        num_used = max(frame[4], c + 1)
+        descend = True
+
+def select_dsatur_vertex(crossings, uncolored, n, color_classes, num_used):
+    # the vertex with the most distinct colours around it, ties go to the most uncoloured neighbours,
+    # or -1 if some vertex already has all n colours around it
+    best_vertex = -1
+    best_key = (-1, -1)
+    vertices = uncolored
+    while vertices:
+        low_bit = vertices & -vertices
+        vertices ^= low_bit
+        vertex = low_bit.bit_length() - 1
+        neighbours = crossings[vertex]
+        saturation = 0
+        for c in range(num_used):
+            if neighbours & color_classes[c]:
+                saturation += 1
+        if saturation == n:
+            return -1
+        key = (saturation, bin(neighbours & uncolored).count("1"))
+        if key > best_key:
+            best_key = key
+            best_vertex = vertex
+    return best_vertex
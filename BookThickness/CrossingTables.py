@@ -0,0 +1,125 @@
+"""CrossingTables.py
+@author lmartin5
+
+This file contains the CrossingTable class. Whether two edges cross only depends on the spine positions of
+their endpoints (p < r < q < s), not on the vertex labels, so for every number of vertices n the crossing
+relation between pairs of positions is computed once. Position pair (p, q) with p < q gets the index
+get_pair_index(p, q, n), and the table stores one packed bitset row per position pair, with a bit set for
+every pair that crosses it. Tables are written to a cache directory and memory-mapped, so later runs do
+not compute them again. A spine is mapped onto the table by looking up the positions of its vertices.
+"""
+
+import mmap
+import os
+import tempfile
+
+# tables that are already open in this process, by number of vertices
+open_tables = {}
+
+def get_cache_directory():
+    # the BOOKTHICKNESS_CACHE environment variable can be used to move the cache
+    default = os.path.join(os.path.expanduser("~"), ".cache", "BookThickness")
+    return os.environ.get("BOOKTHICKNESS_CACHE", default)
+
+def get_crossing_table(n):
+    if n not in open_tables:
+        open_tables[n] = CrossingTable(n)
+    return open_tables[n]
+
+def get_pair_index(p, q, n):
+    # index of position pair (p, q), p < q, when the pairs are listed (0, 1), (0, 2), ..., (1, 2), ...
+    return p * (2 * n - p - 1) // 2 + (q - p - 1)
+
+class CrossingTable():
+
+    def __init__(self, n, directory=None):
+        self.n = n
+        self.pairs = []
+        for p in range(n):
+            for q in range(p + 1, n):
+                self.pairs.append((p, q))
+        self.num_pairs = len(self.pairs)
+        self.row_bytes = (self.num_pairs + 7) // 8
+        self.rows = {}
+        self.crossing_pairs = {}
+
+        if directory is None:
+            directory = get_cache_directory()
+        path = os.path.join(directory, "crossings-" + str(n) + ".bin")
+        self.table = self.load_table(path)
+        if self.table is None:
+            data = self.build_table()
+            try:
+                self.write_table(path, data)
+                self.table = self.load_table(path)
+            except OSError:
+                self.table = None
+            if self.table is None:
+                # the cache directory cannot be used, keep the table in memory
+                self.table = data
+
+    def load_table(self, path):
+        expected_size = self.num_pairs * self.row_bytes
+        if expected_size == 0:
+            return b""
+        try:
+            with open(path, "rb") as table_file:
+                if os.fstat(table_file.fileno()).st_size != expected_size:
+                    return None
+                return mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+    def build_table(self):
+        data = bytearray()
+        for p, q in self.pairs:
+            row = 0
+            # a pair crosses (p, q) when exactly one of its positions is strictly between p and q
+            for inside in range(p + 1, q):
+                for outside in range(0, p):
+                    row |= 1 << get_pair_index(outside, inside, self.n)
+                for outside in range(q + 1, self.n):
+                    row |= 1 << get_pair_index(inside, outside, self.n)
+            data += row.to_bytes(self.row_bytes, "little")
+        return bytes(data)
+
+    def write_table(self, path, data):
+        # written to a temporary file first so another process never maps a half written table
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".crossings-")
+        try:
+            with os.fdopen(file_descriptor, "wb") as table_file:
+                table_file.write(data)
+            os.replace(temporary_path, path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def get_row(self, index):
+        # bitset (as an integer) of the position pairs that cross position pair index
+        row = self.rows.get(index)
+        if row is None:
+            start = index * self.row_bytes
+            row = int.from_bytes(self.table[start:start + self.row_bytes], "little")
+            self.rows[index] = row
+        return row
+
+    def get_crossing_row(self, p, q):
+        if p > q:
+            p, q = q, p
+        return self.get_row(get_pair_index(p, q, self.n))
+
+    def get_crossing_pairs(self, index):
+        # the set bits of a row as a list of pair indices, which is faster to walk through in Python
+        pairs = self.crossing_pairs.get(index)
+        if pairs is None:
+            pairs = []
+            row = self.get_row(index)
+            while row:
+                low_bit = row & -row
+                row ^= low_bit
+                pairs.append(low_bit.bit_length() - 1)
+            self.crossing_pairs[index] = pairs
+        return pairs
@@ -0,0 +1,120 @@
+"""Decomposition.py
+@author lmartin5
+
+This file contains the functions that split a graph into its biconnected blocks before searching.
+The book thickness of a graph is the largest book thickness of its blocks, and embeddings of the blocks
+can be put together without adding crossings: the spine of a block is rotated to start at the cut vertex
+it shares with the blocks already placed, and the rest of it is put right after that cut vertex. The pages
+of the edges stay the same. Connected components are put one after another on the spine, and isolated
+vertices (which only exist because of the highest label) go at the end. Each block is searched on its own,
+relabelled to the vertices 1 - m, so a graph made of two 6 vertex blocks only has to search 6 vertex spines.
+"""
+
+import BookThickness.BookThickness as BookThickness
+from BookThickness.Bounds import find_blocks, get_block_vertices
+from BookThickness.SearchStats import SearchStats
+from BookThickness.Symmetry import get_adjacency
+
+def find_decomposed_embedding(vertices, edges, search, stats=None):
+    """
+    Main function for searching a graph one block at a time
+    Parameters:
+        vertices: a list of the vertices of the graph
+        edges: a list of the edges of the graph
+        search: a function that takes the edges of a block (labelled 1 - m) and returns a BookEmbedding
+                of them, or -1 if there is none
+        stats: a SearchStats to print the progress with, or None
+    Returns:
+        book_embedding: a BookEmbedding of the whole graph, using as many pages as the block that needs
+                        the most, or -1 if the search failed for any block
+    """
+    if stats is None:
+        stats = SearchStats()
+    blocks, isolated = decompose_graph(vertices, edges)
+    block_results = []
+    for i in range(len(blocks)):
+        labels, block_edges = relabel_block(blocks[i])
+        stats.message("Searching block " + str(i + 1) + " / " + str(len(blocks)) + " (" + str(len(labels)) + " vertices)...")
+        block_embedding = search(block_edges)
+        if block_embedding == -1:
+            return -1
+
+        # back to the labels of the graph
+        spine = [labels[vert - 1] for vert in block_embedding.spine]
+        pages = {}
+        for edge, page_number in block_embedding.addedEdges:
+            a = labels[edge[0] - 1]
+            b = labels[edge[1] - 1]
+            pages[(min(a, b), max(a, b))] = page_number
+        block_results.append((spine, pages, block_embedding.numPages))
+
+    spine, pages = merge_block_embeddings(block_results)
+    spine += isolated
+    num_pages = 0
+    for result in block_results:
+        num_pages = max(num_pages, result[2])
+    return BookThickness.embedding_from_pages(num_pages, edges, spine, pages)
+
+def decompose_graph(vertices, edges):
+    """
+    Splits a graph into blocks
+    Parameters:
+        vertices: a list of the vertices of the graph
+        edges: a list of the edges of the graph
+    Returns:
+        (blocks, isolated) where blocks is a list of the blocks, each one a list of edges, ordered so that
+        every block after the first one of its connected component shares exactly one vertex with the blocks
+        before it, and isolated is a list of the vertices that are on no edge
+    """
+    unordered = find_blocks(get_adjacency(vertices, edges))
+    placed_vertices = set()
+    blocks = []
+    while len(unordered) > 0:
+        # a block touching the blocks already placed comes next, otherwise a new component is started
+        next_index = 0
+        for i in range(len(unordered)):
+            if get_block_vertices(unordered[i]) & placed_vertices:
+                next_index = i
+                break
+        block = unordered.pop(next_index)
+        blocks.append(block)
+        placed_vertices |= get_block_vertices(block)
+
+    isolated = [vert for vert in vertices if vert not in placed_vertices]
+    return blocks, isolated
+
+def relabel_block(block):
+    # labels[i] is the vertex of the graph that gets the label i + 1 in the block
+    labels = sorted(get_block_vertices(block))
+    new_label = {}
+    for i in range(len(labels)):
+        new_label[labels[i]] = i + 1
+    block_edges = []
+    for edge in block:
+        block_edges.append((new_label[edge[0]], new_label[edge[1]]))
+    return labels, block_edges
+
+def merge_block_embeddings(block_results):
+    """
+    Puts the embeddings of the blocks together into one spine
+    Parameters:
+        block_results: a list of (spine, pages, number of pages) for each block, in the order of decompose_graph
+    Returns:
+        (spine, pages) where spine holds every vertex on an edge and pages is a dict of edge -> page number
+    """
+    spine = []
+    on_spine = set()
+    pages = {}
+    for block_spine, block_pages, num_pages in block_results:
+        shared = [vert for vert in block_spine if vert in on_spine]
+        if len(shared) == 0:
+            spine += block_spine
+        else:
+            # rotating a spine does not change which edges cross, so the block can start at the cut vertex
+            start = block_spine.index(shared[0])
+            rotated = block_spine[start:] + block_spine[:start]
+            cut_position = spine.index(shared[0])
+            spine[cut_position + 1:cut_position + 1] = rotated[1:]
+        on_spine.update(block_spine)
+        pages.update(block_pages)
+    return spine, pages
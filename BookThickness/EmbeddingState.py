@@ -0,0 +1,244 @@
+"""EmbeddingState.py
+@author lmartin5
+
+This file contains the SpineContext and EmbeddingState classes. They are a compact version
+of the information a BookEmbedding keeps while the pages of a fixed spine are being searched.
+The edges of the graph are numbered, and every set of edges is stored as an integer bitmask
+(bit i is edge i), so an EmbeddingState only holds a few integers and can be copied cheaply.
+Once a full page assignment is found, it is turned back into a BookEmbedding in BookThickness.py.
+"""
+
+from BookThickness.CrossingTables import get_crossing_table, get_pair_index
+
+# spines longer than this are too long for the exhaustive search, so their crossings are worked out directly
+# instead of building a crossing table for them (the table grows like the fourth power of the length)
+MAX_TABLE_VERTICES = 16
+
+def find_crossings_by_position(ends, num_positions):
+    """
+    Works out which edges cross without a crossing table
+    Parameters:
+        ends: a list of the (smaller, larger) spine positions of the endpoints of each edge
+        num_positions: an integer, the length of the spine
+    Returns:
+        crossings: a list of integers, bit j of crossings[i] is set when edges i and j interleave on the spine
+    """
+    at_position = [0] * num_positions
+    for i in range(len(ends)):
+        at_position[ends[i][0]] |= 1 << i
+        at_position[ends[i][1]] |= 1 << i
+    # before[p] holds the edges with an endpoint left of position p, after[p] the ones right of it
+    before = [0] * (num_positions + 1)
+    for p in range(num_positions):
+        before[p + 1] = before[p] | at_position[p]
+    after = [0] * num_positions
+    for p in reversed(range(num_positions - 1)):
+        after[p] = after[p + 1] | at_position[p + 1]
+
+    # an edge crosses (a, b) when it has one endpoint strictly between a and b and the other strictly outside
+    by_start = {}
+    for i in range(len(ends)):
+        by_start.setdefault(ends[i][0], []).append(i)
+    crossings = [0] * len(ends)
+    for a in by_start:
+        indices = sorted(by_start[a], key=lambda i: ends[i][1])
+        inside = 0
+        b = a + 1
+        for i in indices:
+            while b < ends[i][1]:
+                inside |= at_position[b]
+                b += 1
+            crossings[i] = inside & (before[a] | after[ends[i][1]])
+    return crossings
+
+class SpineContext():
+    # everything that only depends on the graph and the spine, shared by all states of that spine
+    __slots__ = ("spine", "edges", "num_edges", "crossings", "free", "position", "incident")
+
+    def __init__(self, edges, spine):
+        self.spine = spine
+        self.edges = list(edges)
+        self.num_edges = len(self.edges)
+
+        position = {}
+        for i in range(len(spine)):
+            position[spine[i]] = i
+        self.position = position
+        self.incident = {}
+        for vert in spine:
+            self.incident[vert] = []
+        for i in range(self.num_edges):
+            self.incident[self.edges[i][0]].append(i)
+            self.incident[self.edges[i][1]].append(i)
+
+        ends = []
+        for i in range(self.num_edges):
+            smaller = position[self.edges[i][0]]
+            larger = position[self.edges[i][1]]
+            if smaller > larger:
+                smaller, larger = larger, smaller
+            ends.append((smaller, larger))
+
+        # crossings[i] has bit j set when edges i and j interleave on the spine
+        if len(spine) > MAX_TABLE_VERTICES:
+            self.crossings = find_crossings_by_position(ends, len(spine))
+        else:
+            # the spine is mapped onto the crossing table of its length: bit_at_pair[k] is the bit of the edge
+            # sitting on position pair k (or 0), so the crossings of an edge are a sum over its row of the table
+            table = get_crossing_table(len(spine))
+            pair_indices = []
+            bit_at_pair = [0] * table.num_pairs
+            for i in range(self.num_edges):
+                pair_indices.append(get_pair_index(ends[i][0], ends[i][1], table.n))
+                bit_at_pair[pair_indices[-1]] = 1 << i
+            get_bit = bit_at_pair.__getitem__
+            self.crossings = [sum(map(get_bit, table.get_crossing_pairs(index))) for index in pair_indices]
+
+        # edges between neighbouring spine vertices (and the first and last vertex) never cross anything
+        self.free = 0
+        for i in range(self.num_edges):
+            if self.is_free(i):
+                self.free |= 1 << i
+
+    def is_free(self, edge_index):
+        a = self.position[self.edges[edge_index][0]]
+        b = self.position[self.edges[edge_index][1]]
+        return abs(a - b) == 1 or abs(a - b) == len(self.spine) - 1
+
+    def swap_adjacent(self, i):
+        """
+        Swaps the vertices at positions i and i + 1 of the spine and updates the crossings
+        Parameters:
+            i: an integer, the position of the first of the two neighbouring vertices
+        Returns:
+            toggled: a list of the (edge index, edge index) pairs that started or stopped crossing
+        """
+        a = self.spine[i]
+        b = self.spine[i + 1]
+        self.spine[i] = b
+        self.spine[i + 1] = a
+        self.position[a] = i + 1
+        self.position[b] = i
+
+        # only the order of a and b changed, so the only pairs affected are an edge (a, x) and an edge (b, y)
+        # with four different endpoints, and each of those pairs switches between crossing and not crossing
+        toggled = []
+        for e in self.incident[a]:
+            x = self.edges[e][0] + self.edges[e][1] - a
+            if x == b:
+                continue
+            for f in self.incident[b]:
+                y = self.edges[f][0] + self.edges[f][1] - b
+                if y == a or y == x:
+                    continue
+                self.crossings[e] ^= 1 << f
+                self.crossings[f] ^= 1 << e
+                toggled.append((e, f))
+
+        for e in self.incident[a] + self.incident[b]:
+            if self.is_free(e):
+                self.free |= 1 << e
+            else:
+                self.free &= ~(1 << e)
+        return toggled
+
+class EmbeddingState():
+    # available[p - 1] holds the edges that can still be put on page p, placed[p - 1] the edges on page p
+    # trail holds what push_edge changed, so pop_edge can take the edges back off in reverse order
+    __slots__ = ("context", "numPages", "available", "placed", "remaining", "trail")
+
+    def __init__(self, context, n):
+        self.context = context
+        self.numPages = n
+        everything = (1 << context.num_edges) - 1
+        self.available = [everything] * n
+        self.placed = [0] * n
+        self.remaining = everything
+        self.trail = []
+
+    def copy(self):
+        state = EmbeddingState.__new__(EmbeddingState)
+        state.context = self.context
+        state.numPages = self.numPages
+        state.available = self.available.copy()
+        state.placed = self.placed.copy()
+        state.remaining = self.remaining
+        state.trail = self.trail.copy()
+        return state
+
+    def is_graph_placed(self):
+        return self.remaining == 0
+
+    def is_possible_to_embedd(self):
+        reachable = 0
+        for page_mask in self.available:
+            reachable |= page_mask
+        return (self.remaining & ~reachable) == 0
+
+    def place_free_edges(self):
+        # free edges go on page 1, like BookEmbedding.place_free_edges
+        self.remaining &= ~self.context.free
+        for i in range(self.numPages):
+            self.available[i] &= ~self.context.free
+
+    def get_next_edge(self):
+        return (self.remaining & -self.remaining).bit_length() - 1
+
+    def get_available_pages(self, edge_index):
+        bit = 1 << edge_index
+        return [i + 1 for i in range(self.numPages) if self.available[i] & bit]
+
+    def place_edge(self, edge_index, page_number):
+        bit = 1 << edge_index
+        self.remaining &= ~bit
+        for i in range(self.numPages):
+            self.available[i] &= ~bit
+        self.available[page_number - 1] &= ~self.context.crossings[edge_index]
+        self.placed[page_number - 1] |= bit
+
+    def push_edge(self, edge_index, page_number):
+        # place_edge that can be undone with pop_edge, only the pages the edge was available on and the
+        # old mask of its page are saved, so the trail grows by one small entry per edge
+        bit = 1 << edge_index
+        pages_with_edge = [i for i in range(self.numPages) if self.available[i] & bit]
+        self.trail.append((edge_index, page_number, pages_with_edge, self.available[page_number - 1]))
+        self.place_edge(edge_index, page_number)
+
+    def pop_edge(self):
+        # undoes the last push_edge
+        edge_index, page_number, pages_with_edge, old_available = self.trail.pop()
+        bit = 1 << edge_index
+        self.remaining |= bit
+        self.placed[page_number - 1] &= ~bit
+        self.available[page_number - 1] = old_available
+        for i in pages_with_edge:
+            self.available[i] |= bit
+
+    def get_page_numbers(self):
+        # the page number of every edge as a tuple, in the order of context.edges (0 for edges not placed yet)
+        page_numbers = [0] * self.context.num_edges
+        for i in range(self.context.num_edges):
+            if self.context.free & (1 << i) and not self.remaining & (1 << i):
+                page_numbers[i] = 1
+        for page in range(self.numPages):
+            page_mask = self.placed[page]
+            while page_mask:
+                low_bit = page_mask & -page_mask
+                page_numbers[low_bit.bit_length() - 1] = page + 1
+                page_mask ^= low_bit
+        return tuple(page_numbers)
+
+    def get_page_assignment(self):
+        # maps every placed edge (as a vertex pair) to its page number
+        pages = {}
+        edges = self.context.edges
+        for i in range(self.context.num_edges):
+            if self.context.free & (1 << i):
+                pages[edges[i]] = 1
+        for page in range(self.numPages):
+            page_mask = self.placed[page]
+            while page_mask:
+                low_bit = page_mask & -page_mask
+                pages[edges[low_bit.bit_length() - 1]] = page + 1
+                page_mask ^= low_bit
+        return pages
@@ -0,0 +1,225 @@
+"""Heuristic.py
+@author lmartin5
+
+This file contains the HeuristicSearch class, which looks for book embeddings with few pages without
+proving anything about them, so it can handle graphs far too big for the exact search. It starts from a
+few spines picked greedily (depth first and breadth first orders and an order that always adds the vertex
+with the most neighbours already placed), gives each one pages with a greedy colouring of its conflict
+graph, and then tries to get rid of one page at a time with simulated annealing. The annealing counts the
+pairs of crossing edges on the same page and lowers it by moving an edge to another page or swapping two
+neighbouring vertices of the spine, until no pair is left. The best embedding is handed back every time it
+improves, so the search can be stopped at any time (see SimpleGraph.find_heuristic_embedding), and its
+number of pages is an upper bound on the book thickness that the exact search can stop at.
+"""
+
+import math
+import random
+import time
+from BookThickness.EmbeddingState import SpineContext
+from BookThickness.ConflictGraph import greedy_color
+
+# the deadline is only looked at once every this many annealing steps
+CHECK_INTERVAL = 256
+# the temperature of the annealing starts at START_TEMPERATURE, is multiplied by COOLING every step, and
+# goes back up to the start once it falls below MIN_TEMPERATURE
+START_TEMPERATURE = 0.5
+COOLING = 0.9999
+MIN_TEMPERATURE = 0.02
+
+class HeuristicSearch():
+
+    def __init__(self, edges, num_vertices, seed=None):
+        """
+        Parameters:
+            edges: a list of the edges of the graph, as (a, b) with a < b
+            num_vertices: an integer, the vertices are 1 - num_vertices
+            seed: the seed of the random number generator, or None for a different search each time
+        """
+        self.edges = list(edges)
+        self.vertices = list(range(1, num_vertices + 1))
+        self.random = random.Random(seed)
+        self.neighbours = {}
+        for vert in self.vertices:
+            self.neighbours[vert] = []
+        for edge in self.edges:
+            self.neighbours[edge[0]].append(edge[1])
+            self.neighbours[edge[1]].append(edge[0])
+
+    def get_greedy_spines(self):
+        # the spines the search starts from, the vertices of highest degree are tried as starting points
+        by_degree = sorted(self.vertices, key=lambda vert: -len(self.neighbours[vert]))
+        starts = by_degree[:3]
+        if len(self.vertices) > 3:
+            starts.append(self.random.choice(self.vertices))
+
+        spines = [list(self.vertices)]
+        for start in starts:
+            spines.append(self.get_traversal_spine(start, depth_first=True))
+            spines.append(self.get_traversal_spine(start, depth_first=False))
+            spines.append(self.get_most_placed_spine(start))
+        return spines
+
+    def get_traversal_spine(self, start, depth_first):
+        # the order a depth first (or breadth first) search from start reaches the vertices, each
+        # component after the first is started from its vertex of highest degree
+        spine = []
+        placed = set()
+        by_degree = sorted(self.vertices, key=lambda vert: -len(self.neighbours[vert]))
+        for root in [start] + by_degree:
+            if root in placed:
+                continue
+            frontier = [root]
+            if not depth_first:
+                placed.add(root)
+            while len(frontier) > 0:
+                if depth_first:
+                    vert = frontier.pop()
+                    if vert in placed:
+                        continue
+                    placed.add(vert)
+                    spine.append(vert)
+                    frontier.extend(neighbour for neighbour in reversed(self.neighbours[vert]) if neighbour not in placed)
+                else:
+                    vert = frontier.pop(0)
+                    spine.append(vert)
+                    for neighbour in self.neighbours[vert]:
+                        if neighbour not in placed:
+                            placed.add(neighbour)
+                            frontier.append(neighbour)
+        return spine
+
+    def get_most_placed_spine(self, start):
+        # adds the vertex with the most neighbours already on the spine next, so edges stay short
+        spine = [start]
+        placed_neighbours = {}
+        for vert in self.vertices:
+            placed_neighbours[vert] = 0
+        for neighbour in self.neighbours[start]:
+            placed_neighbours[neighbour] += 1
+        unplaced = set(self.vertices)
+        unplaced.remove(start)
+        while len(unplaced) > 0:
+            vert = max(unplaced, key=lambda vert: (placed_neighbours[vert], len(self.neighbours[vert]), -vert))
+            spine.append(vert)
+            unplaced.remove(vert)
+            for neighbour in self.neighbours[vert]:
+                placed_neighbours[neighbour] += 1
+        return spine
+
+    def iter_improvements(self, time_limit, target=1):
+        """
+        Searches for embeddings with fewer and fewer pages until time runs out
+        Parameters:
+            time_limit: a number of seconds
+            target: an integer, a number of pages the graph is known to need, the search stops once it gets there
+        Returns:
+            a generator of (number of pages, spine, dict of edge -> page number), one for each embedding that
+            uses fewer pages than the ones before it
+        """
+        deadline = time.monotonic() + time_limit
+        if len(self.edges) == 0:
+            return
+        # a graph with edges needs at least one page, so there is nothing below that to look for
+        target = max(target, 1)
+
+        best_pages = None
+        best = None
+        for spine in self.get_greedy_spines():
+            context = SpineContext(self.edges, spine)
+            colors, num_pages = greedy_color(context.crossings)
+            if best_pages is None or num_pages < best_pages:
+                best_pages = num_pages
+                best = (list(spine), colors)
+                yield best_pages, best[0], dict(zip(self.edges, colors))
+            if best_pages <= target or time.monotonic() >= deadline:
+                return
+
+        while best_pages > target and best_pages - 1 >= 1:
+            found = self.anneal(best[0], best[1], best_pages - 1, deadline)
+            if found is None:
+                return
+            best_pages -= 1
+            best = found
+            yield best_pages, best[0], dict(zip(self.edges, best[1]))
+
+    def anneal(self, spine, colors, k, deadline):
+        """
+        Looks for a k-page embedding starting from a (k + 1)-page one, with simulated annealing
+        Parameters:
+            spine: a list, the spine of the embedding to start from
+            colors: a list of the page number of every edge
+            k: an integer, the number of pages to get down to
+            deadline: the time.monotonic() value to give up at
+        Returns:
+            (spine, colors) of a k-page embedding, or None if time ran out first
+        """
+        if k < 1:
+            return None
+        context = SpineContext(self.edges, list(spine))
+        crossings = context.crossings
+        num_edges = len(self.edges)
+        colors = list(colors)
+
+        # the edges on the page being removed are spread over the other pages
+        for i in range(num_edges):
+            if colors[i] > k:
+                colors[i] = self.random.randint(1, k)
+        page_masks = [0] * (k + 1)
+        for i in range(num_edges):
+            page_masks[colors[i]] |= 1 << i
+        cost = 0
+        for i in range(num_edges):
+            cost += bin(crossings[i] & page_masks[colors[i]]).count("1")
+        cost //= 2
+
+        temperature = START_TEMPERATURE
+        steps = 0
+        while cost > 0:
+            steps += 1
+            if steps % CHECK_INTERVAL == 0 and time.monotonic() >= deadline:
+                return None
+            temperature *= COOLING
+            if temperature < MIN_TEMPERATURE:
+                temperature = START_TEMPERATURE
+
+            if self.random.random() < 0.5 or len(context.spine) < 3:
+                # move an edge to another page, the edges that cross something on their page are picked
+                # far more often than the others
+                i = self.random.randrange(num_edges)
+                if crossings[i] & page_masks[colors[i]] == 0:
+                    i = self.random.randrange(num_edges)
+                page_number = self.random.randint(1, k)
+                if page_number == colors[i]:
+                    continue
+                delta = (bin(crossings[i] & page_masks[page_number]).count("1")
+                         - bin(crossings[i] & page_masks[colors[i]]).count("1"))
+                if delta <= 0 or self.random.random() < math.exp(-delta / temperature):
+                    page_masks[colors[i]] &= ~(1 << i)
+                    page_masks[page_number] |= 1 << i
+                    colors[i] = page_number
+                    cost += delta
+            else:
+                # move a vertex a few places along the spine, one swap of neighbouring vertices at a time
+                position = self.random.randrange(len(context.spine) - 1)
+                distance = min(self.random.randint(1, 3), len(context.spine) - 1 - position)
+                delta = 0
+                for p in range(position, position + distance):
+                    delta += self.get_swap_delta(context.swap_adjacent(p), crossings, colors)
+                if delta <= 0 or self.random.random() < math.exp(-delta / temperature):
+                    cost += delta
+                else:
+                    for p in reversed(range(position, position + distance)):
+                        context.swap_adjacent(p)
+        return list(context.spine), colors
+
+    def get_swap_delta(self, toggled, crossings, colors):
+        # the change in the number of same page crossings after a swap, the pairs in toggled started
+        # crossing if they cross now and stopped crossing otherwise
+        delta = 0
+        for e, f in toggled:
+            if colors[e] == colors[f]:
+                if crossings[e] >> f & 1:
+                    delta += 1
+                else:
+                    delta -= 1
+        return delta
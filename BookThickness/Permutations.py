@@ -6,6 +6,13 @@ of numbers 1 - n for the book embedding problem. These permuations are then used
 with BookThickness.py to search for n-page book embeddings of graphs.
 """
 
+import itertools
+import math
+
+# goes up whenever iter_symmetric_spines gives its spines in a different order, a checkpoint made with
+# symmetry=True only records how many spines of the order were searched (see SimpleGraph.open_checkpoint)
+SYMMETRIC_SPINE_ORDER = 2
+
 def get_spines(n):
     """
     Main function for generating the permutations
@@ -15,111 +22,305 @@ def get_spines(n):
         spines: a list of all possible spine orderings (ignoring flip and rotation elements)
                if n is the integer, n!/2n permutations will be returned
     """
-    spines = []
-    generate_permutations(n, spines)
-    spines = remove_dihedral_elements(spines)
-    spines = [string_to_perm(spine) for spine in spines]
-    return spines
-
-def find_and_remove_flip(line, lines):
-    reverse = line[::-1]
-    try:
-        del lines[reverse]
-    except:
+    return list(iter_spines(n))
+
+def iter_spines(n):
+    """
+    Generates the spines one at a time, without building the other permutations
+    Parameters:
+        n: an integer, spines generated will be orderings of 1, 2, ... , n
+    Returns:
+        a generator of spines (lists of integers), one for each spine ordering up to flips and rotations
+        every spine starts with vertex 1 (rotation) and has spine[1] < spine[-1] (flip)
+        if n >= 3, (n-1)!/2 spines will be generated
+    """
+    if n < 1:
+        return
+    if n < 3:
+        yield list(range(1, n + 1))
         return
 
-def find_and_remove_rotations(line, lines):
-    rotation = line
+    others = list(range(2, n + 1))
+    for i in range(len(others)):
+        for j in range(i + 1, len(others)):
+            middle = others[:i] + others[i + 1:j] + others[j + 1:]
+            for inner in itertools.permutations(middle):
+                yield [1, others[i], *inner, others[j]]
 
-    for i in range(len(line) - 1):
-        rotation = rotation[-1] + rotation[0:-1]
-        try:
-            del lines[rotation]
-        except:
-            return
+def count_spines(n):
+    # number of spines iter_spines(n) generates
+    if n < 1:
+        return 0
+    if n < 3:
+        return 1
+    return math.factorial(n - 1) // 2
 
-def find_and_remove_dihedrals(line, lines):
-    rotation = line
-    find_and_remove_flip(line, lines)
-
-    for i in range(len(line) - 1):
-        rotation = rotation[-1] + rotation[0:-1]
-        try:
-            del lines[rotation]
-        except:
-            pass
-        flip = rotation[::-1]    
-        try:
-            del lines[flip]
-        except:
-            return
+def rank_spine(spine):
+    """
+    Finds where a spine comes in the order of iter_spines
+    Parameters:
+        spine: a list, a spine generated by iter_spines (starting with 1, spine[1] < spine[-1])
+    Returns:
+        rank: an integer, the number of spines iter_spines generates before it
+    """
+    n = len(spine)
+    if n < 3:
+        return 0
+    if spine[0] != 1 or spine[1] > spine[-1]:
+        raise Exception("Only spines starting with 1 and with spine[1] < spine[-1] have a rank.")
 
-def remove_dihedral_elements(perms):
-    perms_dict = store_perms_in_dict(perms)
-    count = 0
-    for perm_value in list(perms_dict):
-        if perm_value in perms_dict:
-            find_and_remove_dihedrals(perm_value, perms_dict)
-            count = count + 1        
-    perms = list(perms_dict.values())
-    return perms
-
-# Function to store permutations of string
-# This function takes three parameters:
-# 1. String
-# 2. Starting index of the string
-# 3. Ending index of the string.
-def generate_perm(a, l, r, perms):
-    if l==r:
-        perms.append(toString(a))
-    else:
-        for i in range(l,r+1):
-            a[l], a[i] = a[i], a[l]
-            generate_perm(a, l+1, r, perms)
-            a[l], a[i] = a[i], a[l] # backtrack
-
-# This code is contributed by Bhavya Jain
-def generate_permutations(num_elements, perms):
-    string = ""
-    for i in range(1, num_elements + 1):
-        if i < 10:
-            string += str(i)
-        else:
-            string += chr(i + 87)
-
-    n = len(string)
-    a = list(string)
-    
-    generate_perm(a, 0, n-1, perms)
-
-def toString(List):
-    return ''.join(List)
-
-def strings_to_perms(perms):
-    for i in range(len(perms)):
-        perms[i] = string_to_perm(perms[i])
-    return perms
-
-def perm_to_string(perm):
-    printed = ""
-    for num in perm:
-        if num < 10: 
-            printed += str(num)
-        else:
-            printed += str(chr(num + 87))
-    return printed
+    # spines are grouped by their second and last vertices, and each group has (n - 3)! spines
+    m = n - 1
+    i = spine[1] - 2
+    j = spine[-1] - 2
+    pair_rank = i * m - i * (i + 1) // 2 + (j - i - 1)
+    return pair_rank * math.factorial(n - 3) + rank_permutation(spine[2:-1])
+
+def unrank_spine(rank, n):
+    """
+    Finds the spine at a position in the order of iter_spines
+    Parameters:
+        rank: an integer, 0 <= rank < count_spines(n)
+        n: an integer, the number of vertices
+    Returns:
+        spine: the list iter_spines generates after rank other spines
+    """
+    if rank < 0 or rank >= count_spines(n):
+        raise Exception("The rank of a spine must be between 0 and " + str(count_spines(n) - 1) + ".")
+    if n < 3:
+        return list(range(1, n + 1))
+
+    pair_rank, inner_rank = divmod(rank, math.factorial(n - 3))
+    m = n - 1
+    i = 0
+    while pair_rank >= m - 1 - i:
+        pair_rank -= m - 1 - i
+        i += 1
+    j = i + 1 + pair_rank
+    others = list(range(2, n + 1))
+    middle = others[:i] + others[i + 1:j] + others[j + 1:]
+    return [1, others[i]] + unrank_permutation(inner_rank, middle) + [others[j]]
+
+def rank_permutation(perm):
+    # the position of perm among the permutations of its values in lexicographic order
+    rank = 0
+    for i in range(len(perm)):
+        smaller = 0
+        for later in perm[i + 1:]:
+            if later < perm[i]:
+                smaller += 1
+        rank += smaller * math.factorial(len(perm) - 1 - i)
+    return rank
 
-def string_to_perm(stri):
+def unrank_permutation(rank, values):
+    # the permutation of the sorted list values at position rank in lexicographic order
+    values = list(values)
     perm = []
-    for character in stri:
-        if character.isnumeric():
-            perm.append(int(character))
-        else:
-            perm.append(ord(character) - 87)
+    for i in reversed(range(len(values))):
+        index, rank = divmod(rank, math.factorial(i))
+        perm.append(values.pop(index))
     return perm
 
-def store_perms_in_dict(perms):
-    new_perms = dict([])
-    for perm in perms:
-        new_perms[perm] = perm
-    return new_perms
\ No newline at end of file
+def next_permutation(perm):
+    # changes perm into the next permutation in lexicographic order, returns False if it was the last one
+    i = len(perm) - 2
+    while i >= 0 and perm[i] >= perm[i + 1]:
+        i -= 1
+    if i < 0:
+        return False
+    j = len(perm) - 1
+    while perm[j] <= perm[i]:
+        j -= 1
+    perm[i], perm[j] = perm[j], perm[i]
+    perm[i + 1:] = reversed(perm[i + 1:])
+    return True
+
+def iter_spine_range(n, start, stop):
+    """
+    Generates the spines of iter_spines with ranks start - (stop - 1), without going through the ones before
+    Parameters:
+        n: an integer, spines generated will be orderings of 1, 2, ... , n
+        start: an integer, the rank of the first spine
+        stop: an integer, one more than the rank of the last spine (at most count_spines(n))
+    Returns:
+        a generator of spines, in the same order as iter_spines
+    """
+    stop = min(stop, count_spines(n))
+    if start >= stop:
+        return
+    spine = unrank_spine(start, n)
+    yield spine.copy()
+    for rank in range(start + 1, stop):
+        inner = spine[2:-1]
+        if next_permutation(inner):
+            spine[2:-1] = inner
+        else:
+            # the group of this second and last vertex is done, the next group starts from its first spine
+            spine = unrank_spine(rank, n)
+        yield spine.copy()
+
+def get_shard_range(n, shard, num_shards):
+    """
+    Splits the spines of iter_spines into num_shards ranges of nearly equal size
+    Parameters:
+        n: an integer, the number of vertices
+        shard: an integer, 1 - num_shards
+        num_shards: an integer, the number of ranges
+    Returns:
+        (start, stop) the ranks of the spines in the shard are start - (stop - 1)
+    """
+    if (type(num_shards) is not int) or (num_shards < 1):
+        raise Exception("The number of shards must be an integer >= 1.")
+    if (type(shard) is not int) or (shard < 1) or (shard > num_shards):
+        raise Exception("The shard must be an integer from 1 to " + str(num_shards) + ".")
+    total = count_spines(n)
+    return total * (shard - 1) // num_shards, total * shard // num_shards
+
+def iter_adjacent_transposition_spines(n):
+    """
+    Generates spines so that each one differs from the one before by swapping two neighbouring vertices
+    (Steinhaus-Johnson-Trotter order on the vertices after vertex 1)
+    Parameters:
+        n: an integer, spines generated will be orderings of 1, 2, ... , n
+    Returns:
+        a generator of (spine, position) pairs, where spine[position] and spine[position + 1] are the two
+        vertices swapped since the previous spine (position is None for the first spine)
+        every spine starts with vertex 1, so all (n-1)! rotation classes are generated, and both a spine
+        and its flip appear (only the ones with spine[1] < spine[-1] are in iter_spines)
+    """
+    if n < 1:
+        return
+    spine = list(range(1, n + 1))
+    yield spine.copy(), None
+    if n < 3:
+        return
+
+    # every vertex after vertex 1 looks left (-1) or right (+1), position 0 is never involved
+    direction = [0] + [-1] * (n - 1)
+    while (True):
+        # the largest mobile vertex is the largest one looking at a smaller neighbour
+        mobile = -1
+        for i in range(1, n):
+            j = i + direction[i]
+            if 1 <= j < n and spine[j] < spine[i] and (mobile == -1 or spine[i] > spine[mobile]):
+                mobile = i
+        if mobile == -1:
+            return
+
+        moved = spine[mobile]
+        j = mobile + direction[mobile]
+        spine[mobile], spine[j] = spine[j], spine[mobile]
+        direction[mobile], direction[j] = direction[j], direction[mobile]
+        for i in range(1, n):
+            if spine[i] > moved:
+                direction[i] = -direction[i]
+        yield spine.copy(), min(mobile, j)
+
+def iter_symmetric_spines(twin_classes, automorphisms=None):
+    """
+    Generates one spine for every orbit of the spines under the symmetries of a graph
+    Parameters:
+        twin_classes: a list of lists covering the vertices, any reordering of a class is an automorphism
+                      (see Symmetry.find_twin_classes)
+        automorphisms: a list of dicts, further automorphisms of the graph that permute the twin classes
+                       (see Symmetry.get_twin_quotient_automorphisms), or None
+    Returns:
+        a generator of spines (lists of vertices), with the vertices of every twin class in increasing order
+        writing each vertex as the number of its twin class, every spine is the smallest sequence of its orbit
+        under flips, rotations and the given automorphisms
+    """
+    classes = [sorted(twin_class) for twin_class in twin_classes]
+    if len(classes) == 0:
+        return
+    class_of = {}
+    for i in range(len(classes)):
+        for vert in classes[i]:
+            class_of[vert] = i
+    if automorphisms is None:
+        automorphisms = []
+    if len(automorphisms) == 0 and len(classes) == len(class_of) and sorted(class_of) == list(range(1, len(classes) + 1)):
+        # only flips and rotations are left, and iter_spines already gives one spine for each of those orbits
+        # without checking every ordering
+        yield from iter_spines(len(classes))
+        return
+
+    # each automorphism as a permutation of the class numbers, the identity stands for the flips and rotations alone
+    class_perms = [list(range(len(classes)))]
+    for automorphism in automorphisms:
+        class_perm = [class_of[automorphism[twin_class[0]]] for twin_class in classes]
+        if class_perm not in class_perms:
+            class_perms.append(class_perm)
+    # to_first[c] holds the permutations taking class c to class 0, the only ones that can start a smaller image
+    to_first = [[] for twin_class in classes]
+    for class_perm in class_perms:
+        to_first[class_perm.index(0)].append(class_perm)
+
+    # the smallest sequence of an orbit always starts with class 0
+    counts = [len(twin_class) for twin_class in classes]
+    counts[0] -= 1
+    forward = [(class_perm, 0) for class_perm in to_first[0][1:]]
+    backward = [(class_perm, 0) for class_perm in to_first[0]]
+    for class_sequence in generate_smallest_sequences(counts, [0], to_first, forward, backward):
+        yield label_class_sequence(class_sequence, classes)
+
+def generate_smallest_sequences(counts, prefix, to_first, forward, backward):
+    # every ordering of a multiset (counts[i] copies of i left to place after prefix) that is the smallest of its
+    # orbit under rotations, flips and the class permutations in to_first
+    # forward holds (permutation, r) for the images starting at position r and going right that are equal to
+    # prefix as far as they are known, and backward the same for the images going left, so a prefix is dropped
+    # as soon as an image is smaller without waiting for the whole sequence
+    n = len(prefix)
+    if sum(counts) == 0:
+        # the rest of each image wraps around to the start of the sequence
+        for class_perm, r in forward:
+            if [class_perm[c] for c in prefix[:r]] < prefix[n - r:]:
+                return
+        for class_perm, r in backward:
+            if [class_perm[c] for c in reversed(prefix[r + 1:])] < prefix[r + 1:]:
+                return
+        yield prefix
+        return
+
+    for c in range(len(counts)):
+        if counts[c] == 0:
+            continue
+        new_forward = []
+        smaller = False
+        for class_perm, r in forward:
+            # c goes to position n - r of the image, which is c itself when r is 0
+            image = class_perm[c]
+            known = c if r == 0 else prefix[n - r]
+            if image < known:
+                smaller = True
+                break
+            if image == known:
+                new_forward.append((class_perm, r))
+        if smaller:
+            continue
+        new_backward = list(backward)
+        for class_perm in to_first[c]:
+            new_forward.append((class_perm, n))
+            # the image going left from c is known up to prefix[0]
+            image = [class_perm[other] for other in reversed(prefix)]
+            if image < prefix[1:] + [c]:
+                smaller = True
+                break
+            if image == prefix[1:] + [c]:
+                new_backward.append((class_perm, n))
+        if smaller:
+            continue
+
+        counts[c] -= 1
+        prefix.append(c)
+        yield from generate_smallest_sequences(counts, prefix, to_first, new_forward, new_backward)
+        prefix.pop()
+        counts[c] += 1
+
+def label_class_sequence(class_sequence, classes):
+    # replaces each class by its vertices in increasing order
+    next_member = [0] * len(classes)
+    spine = []
+    for i in class_sequence:
+        spine.append(classes[i][next_member[i]])
+        next_member[i] += 1
+    return spine
@@ -0,0 +1,129 @@
+"""Prefilter.py
+@author lmartin5
+
+This file contains the prefilter, which rules out spines in blocks of a few thousand at a time with NumPy
+before any of them reach the exact search in BookThickness.py. A block of spines is held as an integer
+array of the position of each vertex on each spine, and the crossings of every pair of edges on every
+spine come out of a few array comparisons. Two lower bounds on the number of pages a spine needs are then
+worked out for the whole block at once: a set of edges that all cross each other, found greedily (k + 1
+of them need k + 1 pages), and the number of crossing pairs (k pages can only hold so many, by Turan's
+theorem). A spine whose bound is above the number of pages being searched has no embedding, so only the
+spines that get through are searched one at a time. Neither bound is ever above the true number of pages,
+so the prefilter never rules out a spine that has an embedding.
+"""
+
+import itertools
+
+# the number of spines in a block, the arrays for a block are block size * edges * edges booleans
+BLOCK_SIZE = 2048
+
+def get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Exception("NumPy is needed for the prefilter (pip install numpy).")
+    return numpy
+
+def get_positions(spines):
+    # positions[i, v - 1] is where vertex v is on spine i, every spine is an ordering of the same vertices
+    numpy = get_numpy()
+    vertices = numpy.array(spines, dtype=numpy.int64)
+    positions = numpy.zeros((len(spines), vertices.max()), dtype=numpy.int64)
+    rows = numpy.arange(len(spines))[:, None]
+    positions[rows, vertices - 1] = numpy.arange(vertices.shape[1])
+    return positions
+
+def find_crossing_matrices(positions, edges):
+    """
+    Finds which edges cross on each spine of a block
+    Parameters:
+        positions: an array of shape (spines, vertices), as given by get_positions
+        edges: a list of the edges of the graph
+    Returns:
+        crossings: a boolean array of shape (spines, edges, edges), crossings[i, e, f] is True when edges e
+                   and f cross if they are on the same page of spine i
+    """
+    numpy = get_numpy()
+    ends = numpy.array(edges, dtype=numpy.int64).reshape(len(edges), 2) - 1
+    first = positions[:, ends[:, 0]]
+    second = positions[:, ends[:, 1]]
+    low = numpy.minimum(first, second)
+    high = numpy.maximum(first, second)
+    # e and f cross when exactly one end of f is strictly inside e, edges sharing a vertex never cross
+    crossings = ((low[:, :, None] < low[:, None, :]) & (low[:, None, :] < high[:, :, None])
+                 & (high[:, :, None] < high[:, None, :]))
+    return crossings | crossings.transpose(0, 2, 1)
+
+def find_clique_sizes(crossings):
+    # the size of a set of edges that all cross each other on each spine, built greedily by always adding
+    # the edge with the most crossings that still crosses every edge in the set
+    numpy = get_numpy()
+    num_spines, num_edges = crossings.shape[:2]
+    rows = numpy.arange(num_spines)
+    degrees = crossings.sum(axis=2)
+    candidates = numpy.ones((num_spines, num_edges), dtype=bool)
+    sizes = numpy.zeros(num_spines, dtype=numpy.int64)
+    while (True):
+        scores = numpy.where(candidates, degrees, -1)
+        chosen = scores.argmax(axis=1)
+        found = scores[rows, chosen] >= 0
+        if not found.any():
+            return sizes
+        sizes += found
+        candidates &= crossings[rows, chosen]
+
+def find_density_bounds(crossings):
+    # a graph with v vertices and m edges needs at least v^2 / (v^2 - 2m) colours (Turan's theorem), here
+    # the vertices are the edges that cross something and the edges are the crossing pairs
+    numpy = get_numpy()
+    degrees = crossings.sum(axis=2)
+    num_crossing = (degrees > 0).sum(axis=1)
+    num_pairs = degrees.sum(axis=1) // 2
+    squares = num_crossing * num_crossing
+    bounds = numpy.ones(len(crossings), dtype=numpy.int64)
+    dense = num_pairs > 0
+    # v^2 / (v^2 - 2m) rounded up, in integers so a bound that is exact is not pushed up by rounding
+    bounds[dense] = -(-squares[dense] // (squares[dense] - 2 * num_pairs[dense]))
+    return bounds
+
+def find_page_bounds(edges, spines):
+    """
+    Finds a lower bound on the number of pages each spine of a block needs
+    Parameters:
+        edges: a list of the edges of the graph
+        spines: a list of spines, each one a list of the vertices 1 - the number of vertices
+    Returns:
+        bounds: a list of integers, one for each spine
+    """
+    numpy = get_numpy()
+    if len(edges) == 0:
+        return [0] * len(spines)
+    crossings = find_crossing_matrices(get_positions(spines), edges)
+    bounds = numpy.maximum(find_clique_sizes(crossings), find_density_bounds(crossings))
+    return bounds.tolist()
+
+def iter_spine_bounds(edges, spines, block_size=BLOCK_SIZE):
+    """
+    Goes through spines a block at a time, giving a lower bound on the number of pages each one needs
+    Parameters:
+        edges: a list of the edges of the graph
+        spines: an iterable of spines, it is only read one block at a time
+        block_size: an integer, the number of spines in a block
+    Returns:
+        a generator of (spine, bound) in the order of spines
+    """
+    spines = iter(spines)
+    while (True):
+        block = list(itertools.islice(spines, block_size))
+        if len(block) == 0:
+            return
+        yield from zip(block, find_page_bounds(edges, block))
+
+def filter_spines(n, edges, spines, block_size=BLOCK_SIZE):
+    # gives every spine in order, but None in place of the spines that need more than n pages, so a search can
+    # still count them (i.e. for its checkpoint) without searching them
+    for spine, bound in iter_spine_bounds(edges, spines, block_size):
+        if bound > n:
+            yield None
+        else:
+            yield spine
@@ -0,0 +1,130 @@
+"""PrefixSearch.py
+@author lmartin5
+
+This file contains the PrefixSearch class, a branch and bound search that builds the spine one vertex
+at a time instead of testing complete permutations. Once both endpoints of an edge are on the spine,
+which edges it crosses is already decided, so the edges inside a prefix of the spine have a fixed
+conflict graph. If that conflict graph cannot be coloured with n pages, no spine starting with the
+prefix has an n-page embedding and all of them are skipped at once.
+"""
+
+from BookThickness.ConflictGraph import find_coloring
+
+class PrefixSearch():
+
+    def __init__(self, n, edges, num_vertices):
+        self.numPages = n
+        self.edges = list(edges)
+        self.num_vertices = num_vertices
+        self.incident = {}
+        for vert in range(1, num_vertices + 1):
+            self.incident[vert] = []
+        for edge in self.edges:
+            self.incident[edge[0]].append(edge)
+            self.incident[edge[1]].append(edge)
+
+        self.spine = []
+        self.position = {}
+        # the edges with both endpoints placed, their crossings (bitmasks over this list) and their pages
+        self.placed_edges = []
+        self.ends = []
+        self.crossings = []
+        self.colors = []
+        self.nodes_expanded = 0
+        self.nodes_pruned = 0
+
+    def search(self):
+        """
+        Runs the branch and bound
+        Returns:
+            (spine, pages) where pages is a dict of edge -> page number, or None if there is no n-page embedding
+            spines are only searched up to rotation (vertex 1 is first) and flip (spine[1] < spine[-1])
+        """
+        if self.num_vertices == 0:
+            return None
+        remaining = set(range(2, self.num_vertices + 1))
+        self.add_vertex(1)
+        if self.branch(remaining):
+            pages = {}
+            for i in range(len(self.placed_edges)):
+                pages[self.placed_edges[i]] = self.colors[i]
+            return self.spine.copy(), pages
+        return None
+
+    def branch(self, remaining):
+        if len(remaining) == 0:
+            return True
+        # the flip of a spine is searched instead when its last vertex is smaller than its second one
+        if len(self.spine) >= 2 and max(remaining) < self.spine[1]:
+            return False
+
+        for vert in sorted(remaining):
+            self.nodes_expanded += 1
+            num_placed = len(self.placed_edges)
+            if self.add_vertex(vert):
+                remaining.remove(vert)
+                if self.branch(remaining):
+                    return True
+                remaining.add(vert)
+            else:
+                self.nodes_pruned += 1
+            self.remove_vertex(vert, num_placed)
+        return False
+
+    def add_vertex(self, vert):
+        # puts vert at the end of the spine, returns False if the edges inside the new prefix need more than n pages
+        depth = len(self.spine)
+        self.spine.append(vert)
+        self.position[vert] = depth
+
+        first_new = len(self.placed_edges)
+        for edge in self.incident[vert]:
+            other = edge[0] + edge[1] - vert
+            if other not in self.position:
+                continue
+            start = self.position[other]
+            # an edge (p, q) inside the prefix crosses the new edge exactly when p < start < q
+            mask = 0
+            for i in range(first_new):
+                p, q = self.ends[i]
+                if p < start < q:
+                    mask |= 1 << i
+            new_index = len(self.placed_edges)
+            for i in range(first_new):
+                if (mask >> i) & 1:
+                    self.crossings[i] |= 1 << new_index
+            self.placed_edges.append(edge)
+            self.ends.append((start, depth))
+            self.crossings.append(mask)
+            self.colors.append(0)
+
+        # first try to give the new edges pages without moving the old ones, only recolour everything if that fails
+        for i in range(first_new, len(self.placed_edges)):
+            used = set()
+            mask = self.crossings[i]
+            while mask:
+                low_bit = mask & -mask
+                mask ^= low_bit
+                used.add(self.colors[low_bit.bit_length() - 1])
+            page = 1
+            while page in used:
+                page += 1
+            if page > max(self.numPages, 1):
+                colors = find_coloring(self.crossings, self.numPages)[0]
+                if colors is None:
+                    return False
+                self.colors = colors
+                return True
+            self.colors[i] = page
+        return True
+
+    def remove_vertex(self, vert, num_placed):
+        kept = (1 << num_placed) - 1
+        for i in range(num_placed):
+            self.crossings[i] &= kept
+        del self.placed_edges[num_placed:]
+        del self.ends[num_placed:]
+        del self.crossings[num_placed:]
+        del self.colors[num_placed:]
+        self.spine.pop()
+        del self.position[vert]
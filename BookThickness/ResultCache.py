@@ -0,0 +1,93 @@
+"""ResultCache.py
+@author lmartin5
+
+This file contains the ResultCache class, an SQLite database of the searches that have already been run.
+Results are stored under the canonical form of the graph (see Symmetry.get_canonical_form) and a number
+of pages, so a graph that is isomorphic to one searched before, with any labelling, is answered from the
+database. A result is either an embedding, stored with the canonical labels and mapped back to the labels
+of the graph it is asked for, or the fact that no spine has an embedding with that many pages. An
+embedding with n pages is also one with more pages, and a graph with no n-page embedding has none with
+fewer pages, so one search answers more than one page count.
+"""
+
+import json
+import os
+import sqlite3
+from BookThickness.CrossingTables import get_cache_directory
+
+def get_default_path():
+    return os.path.join(get_cache_directory(), "results.sqlite")
+
+class ResultCache():
+
+    def __init__(self, path=None):
+        if path is None:
+            path = get_default_path()
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS results (canon TEXT NOT NULL, pages INTEGER NOT NULL, "
+                                    "embeddable INTEGER NOT NULL, spine TEXT, assignment TEXT, "
+                                    "PRIMARY KEY (canon, pages))")
+
+    def close(self):
+        self.connection.close()
+
+    def get_embedding(self, canon, order, n):
+        """
+        Looks for a saved embedding with at most n pages
+        Parameters:
+            canon: the canonical form of the graph
+            order: the canonical labelling of the graph, order[i] is the vertex with canonical label i + 1
+            n: an integer, the number of pages
+        Returns:
+            (number of pages, spine, dict of edge -> page number) in the labels of the graph, using the fewest
+            pages of any saved embedding, or None if no saved embedding has at most n pages
+        """
+        row = self.connection.execute("SELECT pages, spine, assignment FROM results WHERE canon = ? AND embeddable = 1 "
+                                      "AND pages <= ? ORDER BY pages LIMIT 1", (canon, n)).fetchone()
+        if row is None:
+            return None
+        num_pages, spine, assignment = row
+        spine = [order[vert - 1] for vert in json.loads(spine)]
+        pages = {}
+        for a, b, page_number in json.loads(assignment):
+            a = order[a - 1]
+            b = order[b - 1]
+            pages[(min(a, b), max(a, b))] = page_number
+        return num_pages, spine, pages
+
+    def is_infeasible(self, canon, n):
+        # True if the graph is known to have no n-page embedding
+        row = self.connection.execute("SELECT 1 FROM results WHERE canon = ? AND embeddable = 0 AND pages >= ? LIMIT 1",
+                                      (canon, n)).fetchone()
+        return row is not None
+
+    def get_lower_bound(self, canon):
+        # one more than the largest page count known to fail, or 0 if there is none
+        row = self.connection.execute("SELECT MAX(pages) FROM results WHERE canon = ? AND embeddable = 0",
+                                      (canon,)).fetchone()
+        if row[0] is None:
+            return 0
+        return row[0] + 1
+
+    def save_embedding(self, canon, order, n, spine, pages):
+        label = {}
+        for i in range(len(order)):
+            label[order[i]] = i + 1
+        canonical_spine = [label[vert] for vert in spine]
+        assignment = []
+        for edge in pages:
+            a = label[edge[0]]
+            b = label[edge[1]]
+            assignment.append([min(a, b), max(a, b), pages[edge]])
+        assignment.sort()
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, 1, ?, ?)",
+                                    (canon, n, json.dumps(canonical_spine), json.dumps(assignment)))
+
+    def save_infeasible(self, canon, n):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, 0, NULL, NULL)", (canon, n))
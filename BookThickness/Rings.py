@@ -0,0 +1,140 @@
+"""Rings.py
+@author lmartin5
+
+This file contains the functions that build total graphs of finite commutative rings. The total graph
+of R has the elements of R as vertices, and x and y are adjacent when x + y is a zero divisor (0 counts
+as a zero divisor). Rings are finite products of the integers mod n (Z_n) and finite fields (F_q, q a
+prime power), given as a string such as "Z3xZ3" or "Z_2 x F_4", or as a list of factors such as
+[("Z", 3), ("F", 4)]. The addition and zero divisor tables of each factor are built with NumPy, and the
+whole adjacency matrix is worked out at once from them. NumPy is only imported when a total graph is built.
+
+The elements are numbered in mixed radix, so for Z_3 x Z_3 the vertices are
+1 = (0, 0), 2 = (0, 1), 3 = (0, 2), 4 = (1, 0), ..., 9 = (2, 2)
+An element of F_q (q = p^k) is written as a number 0 - (q - 1) whose base p digits are its coordinates
+over F_p, which is all that is needed, since the only zero divisor of a field is 0.
+"""
+
+import math
+import re
+
+def get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Exception("NumPy is needed to build total graphs of rings (pip install numpy).")
+    return numpy
+
+def parse_ring(ring):
+    """
+    Reads the factors of a ring
+    Parameters:
+        ring: a string such as "Z3xZ3", "Z_4 x F_9" or "F8", or a list of factors such as [("Z", 3), ("F", 4)]
+              or ["Z3", "F4"]
+    Returns:
+        factors: a list of (kind, order) tuples, kind is "Z" for the integers mod order or "F" for a field
+    """
+    if type(ring) is str:
+        ring = [part for part in re.split(r"[xX×*]", ring)]
+    if (type(ring) is not list and type(ring) is not tuple) or len(ring) == 0:
+        raise Exception("A ring must be a string like \"Z3xZ3\" or a list of factors like [(\"Z\", 3), (\"F\", 4)].")
+
+    factors = []
+    for factor in ring:
+        if type(factor) is str:
+            match = re.fullmatch(r"\s*([ZzFf])_?\(?(\d+)\)?\s*", factor)
+            if match is None:
+                raise Exception("Could not read the ring factor \"" + factor + "\", use Zn or Fq (ex. Z3, F_4).")
+            factor = (match.group(1).upper(), int(match.group(2)))
+        if (type(factor) is not tuple) or (len(factor) != 2) or (factor[0] not in ("Z", "F")) or (type(factor[1]) is not int):
+            raise Exception("Each ring factor must be (\"Z\", n) or (\"F\", q).")
+
+        kind, order = factor
+        if kind == "Z" and order < 2:
+            raise Exception("Z_n requires an integer n >= 2.")
+        if kind == "F" and get_prime_power(order) is None:
+            raise Exception("F_q requires q to be a prime power.")
+        factors.append((kind, order))
+    return factors
+
+def get_prime_power(q):
+    # (p, k) with q = p^k for a prime p, or None if q is not a prime power
+    if q < 2:
+        return None
+    p = 2
+    while p * p <= q and q % p != 0:
+        p += 1
+    if q % p != 0:
+        p = q
+    k = 0
+    while q % p == 0:
+        q //= p
+        k += 1
+    if q != 1:
+        return None
+    return p, k
+
+def get_factor_tables(kind, order):
+    """
+    Builds the tables of one factor of a ring
+    Parameters:
+        kind: "Z" or "F"
+        order: an integer, the number of elements
+    Returns:
+        (addition, zero_divisors) where addition[a, b] is a + b and zero_divisors[a] says whether a is a zero divisor
+    """
+    numpy = get_numpy()
+    elements = numpy.arange(order)
+    if kind == "Z":
+        addition = (elements[:, None] + elements[None, :]) % order
+        zero_divisors = numpy.array([math.gcd(a, order) != 1 for a in range(order)])
+    else:
+        # F_q adds as a vector space over F_p, one base p digit at a time
+        p, k = get_prime_power(order)
+        addition = numpy.zeros((order, order), dtype=numpy.int64)
+        place = 1
+        for i in range(k):
+            digits = (elements // place) % p
+            addition += ((digits[:, None] + digits[None, :]) % p) * place
+            place *= p
+        zero_divisors = elements == 0
+    return addition, zero_divisors
+
+def get_ring_elements(ring):
+    # the element of the ring that each vertex stands for, vertex i + 1 is elements[i]
+    factors = parse_ring(ring)
+    orders = [order for kind, order in factors]
+    elements = []
+    for index in range(math.prod(orders)):
+        element = []
+        for order in reversed(orders):
+            element.append(index % order)
+            index //= order
+        elements.append(tuple(reversed(element)))
+    return elements
+
+def get_total_graph_edges(ring):
+    """
+    Builds the edge set of the total graph of a ring
+    Parameters:
+        ring: a ring, as read by parse_ring
+    Returns:
+        (num_vertices, edges) where edges is a sorted list of (a, b) with a < b, vertices numbered as in get_ring_elements
+    """
+    numpy = get_numpy()
+    factors = parse_ring(ring)
+    orders = [order for kind, order in factors]
+    num_vertices = math.prod(orders)
+
+    # x + y is a zero divisor when it is one in any factor
+    indices = numpy.arange(num_vertices)
+    adjacent = numpy.zeros((num_vertices, num_vertices), dtype=bool)
+    stride = num_vertices
+    for kind, order in factors:
+        stride //= order
+        component = (indices // stride) % order
+        addition, zero_divisors = get_factor_tables(kind, order)
+        adjacent |= zero_divisors[addition[component[:, None], component[None, :]]]
+
+    rows, columns = numpy.nonzero(numpy.triu(adjacent, k=1))
+    edges = list(zip((rows + 1).tolist(), (columns + 1).tolist()))
+    return num_vertices, edges
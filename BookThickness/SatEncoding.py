@@ -0,0 +1,147 @@
+"""SatEncoding.py
+@author lmartin5
+
+This file contains the BookEmbeddingEncoding class, which writes the question "does this graph have an
+n-page book embedding?" as one CNF formula, so the spine order and the pages of the edges are searched
+together instead of one spine at a time. It follows the usual SAT formulation of book embeddings:
+    - an ordering variable for every pair of vertices u < v, true when u comes before v on the spine,
+      with transitivity clauses so the variables describe a linear order
+    - a page variable for every edge and page, and a clause putting every edge on at least one page
+    - a same-page variable for every pair of edges without a common endpoint, forced true when the two
+      edges share a page and forbidding every spine order in which their endpoints interleave
+The formula is solved with the SatSolver in SatSolver.py, or written out in DIMACS format for an
+outside solver. A satisfying assignment is decoded back into a spine and a page for every edge.
+"""
+
+import itertools
+from BookThickness.SatSolver import SatSolver
+
+class BookEmbeddingEncoding():
+
+    def __init__(self, n, edges, vertices, spine=None):
+        # if spine is given the vertex order is fixed to it, otherwise it is part of the search
+        self.numPages = n
+        self.edges = list(edges)
+        self.vertices = list(vertices)
+        self.num_vars = 0
+        self.clauses = []
+
+        self.order_vars = {}
+        for u, v in itertools.combinations(self.vertices, 2):
+            self.order_vars[(u, v)] = self.new_var()
+        self.page_vars = {}
+        for edge in self.edges:
+            for page in range(1, n + 1):
+                self.page_vars[(edge, page)] = self.new_var()
+
+        self.add_order_clauses(spine)
+        self.add_page_clauses()
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def before(self, u, v):
+        # literal that is true when u comes before v on the spine
+        if u < v:
+            return self.order_vars[(u, v)]
+        return -self.order_vars[(v, u)]
+
+    def add_order_clauses(self, spine):
+        if spine is not None:
+            for i in range(len(spine)):
+                for j in range(i + 1, len(spine)):
+                    self.clauses.append([self.before(spine[i], spine[j])])
+            return
+
+        for u, v, w in itertools.permutations(self.vertices, 3):
+            self.clauses.append([-self.before(u, v), -self.before(v, w), self.before(u, w)])
+
+        # rotations and flips of a spine give the same embeddings, so the first vertex is put first and
+        # the second vertex before the third
+        if len(self.vertices) > 0:
+            first = self.vertices[0]
+            for other in self.vertices[1:]:
+                self.clauses.append([self.before(first, other)])
+        if len(self.vertices) > 2:
+            self.clauses.append([self.before(self.vertices[1], self.vertices[2])])
+
+    def add_page_clauses(self):
+        for edge in self.edges:
+            self.clauses.append([self.page_vars[(edge, page)] for page in range(1, self.numPages + 1)])
+
+        for edge, other in itertools.combinations(self.edges, 2):
+            if len(set(edge + other)) < 4:
+                continue
+            same_page = self.new_var()
+            for page in range(1, self.numPages + 1):
+                self.clauses.append([-self.page_vars[(edge, page)], -self.page_vars[(other, page)], same_page])
+
+            a, b = edge
+            c, d = other
+            # the eight spine orders of a, b, c, d in which the two edges cross
+            for w, x, y, z in [(a, c, b, d), (a, d, b, c), (b, c, a, d), (b, d, a, c),
+                               (c, a, d, b), (c, b, d, a), (d, a, c, b), (d, b, c, a)]:
+                self.clauses.append([-same_page, -self.before(w, x), -self.before(x, y), -self.before(y, z)])
+
+    def solve(self):
+        # returns the decoded (spine, pages) pair, or None if there is no n-page embedding
+        solver = SatSolver(self.num_vars)
+        for clause in self.clauses:
+            if not solver.add_clause(clause):
+                return None
+        if not solver.solve():
+            return None
+        return self.decode(solver.model)
+
+    def decode(self, model):
+        # model[v] is the value of variable v, returns the spine and a dict of edge -> page number
+        num_before = {}
+        for vert in self.vertices:
+            num_before[vert] = 0
+        for (u, v), var in self.order_vars.items():
+            if model[var]:
+                num_before[v] += 1
+            else:
+                num_before[u] += 1
+        spine = sorted(self.vertices, key=lambda vert: num_before[vert])
+
+        pages = {}
+        for edge in self.edges:
+            for page in range(1, self.numPages + 1):
+                if model[self.page_vars[(edge, page)]]:
+                    pages[edge] = page
+                    break
+        return spine, pages
+
+    def write_dimacs(self, path):
+        with open(path, "w") as dimacs_file:
+            dimacs_file.write("c " + str(self.numPages) + "-page book embedding of " + str(len(self.edges)) + " edges\n")
+            for (u, v), var in self.order_vars.items():
+                dimacs_file.write("c order " + str(var) + " " + str(u) + " " + str(v) + "\n")
+            for (edge, page), var in self.page_vars.items():
+                dimacs_file.write("c page " + str(var) + " " + str(edge[0]) + " " + str(edge[1]) + " " + str(page) + "\n")
+            dimacs_file.write("p cnf " + str(self.num_vars) + " " + str(len(self.clauses)) + "\n")
+            for clause in self.clauses:
+                dimacs_file.write(" ".join(str(literal) for literal in clause) + " 0\n")
+
+def read_dimacs_model(path, num_vars):
+    # reads the output of an outside SAT solver ("s ..." and "v ..." lines, or just the literals)
+    # returns a model list like SatSolver.model, or None if the solver reported the formula unsatisfiable
+    model = [None] + [False] * num_vars
+    with open(path) as model_file:
+        for line in model_file:
+            words = line.split()
+            if len(words) == 0 or words[0] == "c":
+                continue
+            if words[0] == "s":
+                if "UNSAT" in line:
+                    return None
+                continue
+            if words[0] == "v":
+                words = words[1:]
+            for word in words:
+                literal = int(word)
+                if 0 < literal <= num_vars:
+                    model[literal] = True
+    return model
@@ -0,0 +1,296 @@
+"""SatSolver.py
+@author lmartin5
+
+This file contains the SatSolver class, a small CDCL (conflict driven clause learning) SAT solver
+written in pure Python so the package does not need any outside solver. Clauses are lists of
+non-zero integers in the DIMACS convention (3 is variable 3, -3 is its negation). The solver uses
+two watched literals, first-UIP clause learning, VSIDS variable activities with phase saving,
+Luby restarts and a simple learnt clause clean up. It is used by SatEncoding.py to search for
+book embeddings.
+
+ex.
+solver = SatSolver(2)
+solver.add_clause([1, 2])
+solver.add_clause([-1])
+solver.solve()    # True, and solver.model[2] is True
+"""
+
+import heapq
+
+class SatSolver():
+
+    def __init__(self, num_vars=0):
+        self.num_vars = 0
+        # clauses hold literal codes: variable v is code 2v, its negation is code 2v + 1
+        self.clauses = []
+        self.learnts = []
+        self.watches = [[], []]
+        self.values = [0, 0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.seen = [False]
+        self.heap = []
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.ok = True
+        self.model = None
+        self.num_conflicts = 0
+        self.num_decisions = 0
+        self.new_vars(num_vars)
+
+    def new_vars(self, count):
+        for i in range(count):
+            self.num_vars += 1
+            self.watches += [[], []]
+            self.values += [0, 0]
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.phase.append(False)
+            self.seen.append(False)
+            heapq.heappush(self.heap, (0.0, self.num_vars))
+
+    def add_clause(self, literals):
+        # clauses can only be added before solving, returns False once the formula is known to be unsatisfiable
+        if not self.ok:
+            return False
+        codes = []
+        for literal in literals:
+            var = abs(literal)
+            if var > self.num_vars:
+                self.new_vars(var - self.num_vars)
+            code = 2 * var if literal > 0 else 2 * var + 1
+            if (code ^ 1) in codes or self.values[code] == 1:
+                return True
+            if code not in codes and self.values[code] == 0:
+                codes.append(code)
+
+        if len(codes) == 0:
+            self.ok = False
+        elif len(codes) == 1:
+            self.enqueue(codes[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.attach_clause(codes, False)
+        return self.ok
+
+    def attach_clause(self, codes, learnt):
+        index = len(self.clauses)
+        self.clauses.append(codes)
+        self.watches[codes[0]].append(index)
+        self.watches[codes[1]].append(index)
+        if learnt:
+            self.learnts.append(index)
+        return index
+
+    def enqueue(self, code, reason):
+        var = code >> 1
+        self.values[code] = 1
+        self.values[code ^ 1] = -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(code)
+
+    def propagate(self):
+        # returns the index of a conflicting clause, or None
+        values = self.values
+        clauses = self.clauses
+        watches = self.watches
+        while self.qhead < len(self.trail):
+            false_code = self.trail[self.qhead] ^ 1
+            self.qhead += 1
+            watch_list = watches[false_code]
+            kept = []
+            for position in range(len(watch_list)):
+                index = watch_list[position]
+                clause = clauses[index]
+                if clause is None:
+                    continue
+                if clause[0] == false_code:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if values[first] == 1:
+                    kept.append(index)
+                    continue
+
+                moved = False
+                for k in range(2, len(clause)):
+                    if values[clause[k]] != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches[clause[1]].append(index)
+                        moved = True
+                        break
+                if moved:
+                    continue
+
+                kept.append(index)
+                if values[first] == -1:
+                    kept.extend(watch_list[position + 1:])
+                    watches[false_code] = kept
+                    self.qhead = len(self.trail)
+                    return index
+                self.enqueue(first, index)
+            watches[false_code] = kept
+        return None
+
+    def analyze(self, conflict):
+        # first-UIP learning, returns the learnt clause (asserting literal first) and the level to go back to
+        seen = self.seen
+        learnt = [None]
+        current_level = len(self.trail_lim)
+        counter = 0
+        code = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while (True):
+            start = 0 if code is None else 1
+            for k in range(start, len(clause)):
+                other = clause[k]
+                var = other >> 1
+                if not seen[var] and self.level[var] > 0:
+                    seen[var] = True
+                    self.bump_activity(var)
+                    if self.level[var] >= current_level:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+
+            while not seen[self.trail[index] >> 1]:
+                index -= 1
+            code = self.trail[index]
+            index -= 1
+            seen[code >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reason[code >> 1]]
+
+        learnt[0] = code ^ 1
+        for other in learnt[1:]:
+            seen[other >> 1] = False
+
+        backtrack_level = 0
+        if len(learnt) > 1:
+            highest = 1
+            for k in range(2, len(learnt)):
+                if self.level[learnt[k] >> 1] > self.level[learnt[highest] >> 1]:
+                    highest = k
+            learnt[1], learnt[highest] = learnt[highest], learnt[1]
+            backtrack_level = self.level[learnt[1] >> 1]
+        return learnt, backtrack_level
+
+    def bump_activity(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            for other in range(1, self.num_vars + 1):
+                self.activity[other] *= 1e-100
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[other], other) for other in range(1, self.num_vars + 1)
+                         if self.values[2 * other] == 0]
+            heapq.heapify(self.heap)
+        elif self.values[2 * var] == 0:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        for code in self.trail[self.trail_lim[level]:]:
+            var = code >> 1
+            self.values[code] = 0
+            self.values[code ^ 1] = 0
+            self.reason[var] = None
+            self.phase[var] = (code & 1) == 0
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch_var(self):
+        while len(self.heap) > 0:
+            var = heapq.heappop(self.heap)[1]
+            if self.values[2 * var] == 0:
+                return var
+        return None
+
+    def reduce_learnts(self):
+        # forget the longer half of the learnt clauses that are not the reason for a current assignment
+        locked = set()
+        for code in self.trail:
+            if self.reason[code >> 1] is not None:
+                locked.add(self.reason[code >> 1])
+        learnts = [index for index in self.learnts if self.clauses[index] is not None]
+        learnts.sort(key=lambda index: len(self.clauses[index]))
+        kept = learnts[:len(learnts) // 2]
+        for index in learnts[len(learnts) // 2:]:
+            if index in locked or len(self.clauses[index]) <= 2:
+                kept.append(index)
+            else:
+                self.clauses[index] = None
+        self.learnts = kept
+
+    def solve(self):
+        # returns True and fills in self.model (model[v] is the value of variable v) if the clauses are satisfiable
+        if not self.ok:
+            return False
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restart_number = 0
+        restart_limit = 100 * luby(restart_number)
+        conflicts_since_restart = 0
+        max_learnts = max(len(self.clauses) // 3, 1000)
+
+        while (True):
+            conflict = self.propagate()
+            if conflict is not None:
+                self.num_conflicts += 1
+                conflicts_since_restart += 1
+                if len(self.trail_lim) == 0:
+                    self.ok = False
+                    return False
+                learnt, backtrack_level = self.analyze(conflict)
+                self.backtrack(backtrack_level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach_clause(learnt, True))
+                self.var_inc /= 0.95
+                continue
+
+            if conflicts_since_restart >= restart_limit:
+                self.backtrack(0)
+                restart_number += 1
+                restart_limit = 100 * luby(restart_number)
+                conflicts_since_restart = 0
+            if len(self.learnts) >= max_learnts:
+                self.reduce_learnts()
+                max_learnts = int(max_learnts * 1.1)
+
+            var = self.pick_branch_var()
+            if var is None:
+                self.model = [None] + [self.values[2 * v] == 1 for v in range(1, self.num_vars + 1)]
+                self.backtrack(0)
+                return True
+            self.num_decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(2 * var if self.phase[var] else 2 * var + 1, None)
+
+def luby(i):
+    # i-th term (starting at 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+    size = 1
+    sequence_exponent = 0
+    while size < i + 1:
+        sequence_exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        sequence_exponent -= 1
+        i = i % size
+    return 1 << sequence_exponent
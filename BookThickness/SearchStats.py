@@ -0,0 +1,138 @@
+"""SearchStats.py
+@author lmartin5
+
+This file contains the SearchStats class, which counts what a search does and reports its progress. The
+searches in BookThickness.py and SimpleGraph.py take a SearchStats and add to its counters: the spines
+tested (and how many of them Prefilter.py ruled out), the partial embeddings expanded and pruned, the
+copies of partial embeddings made, and the seconds spent in each phase (i.e. the lower bounds, the
+heuristic and the search itself). Progress is reported at
+most once every interval seconds, however fast the spines go by, either to a function given by the user
+or as a progress line on the terminal. With quiet=True nothing is printed at all, so the searches can be
+used inside other programs.
+
+ex.
+stats = SearchStats(progress=lambda stats: print(stats.get_rate()), interval=1)
+graph.find_book_embedding(stats=stats)
+print(stats.spines_tested, stats.nodes_expanded)
+"""
+
+import contextlib
+import time
+
+class SearchTimeout(Exception):
+    # raised by SearchStats.check_deadline once the deadline has passed, see SimpleGraph.run_exact_search
+    pass
+
+class SearchStats():
+
+    def __init__(self, progress=None, interval=0.5, quiet=False):
+        """
+        Parameters:
+            progress: a function called with this SearchStats as the search goes, or None to print a
+                      progress line (unless quiet is True)
+            interval: the number of seconds between two progress reports
+            quiet: True to print nothing, neither progress nor results
+        """
+        self.progress = progress
+        self.interval = interval
+        self.quiet = quiet
+
+        # totals over the whole search
+        self.spines_tested = 0
+        self.spines_prefiltered = 0
+        self.nodes_expanded = 0
+        self.nodes_pruned = 0
+        self.copies_made = 0
+        self.phase_seconds = {}
+        # the sweep of spines going on now, completed counts from the start of the sweep (or the checkpoint)
+        self.pages = None
+        self.completed = 0
+        self.total_spines = None
+        self.best_pages = None
+        self.sweep_start = time.monotonic()
+        self.sweep_tested = 0
+
+        self.next_report = 0
+        self.line_length = 0
+        # a time.monotonic() value, searches stop with SearchTimeout at the first spine after it
+        self.deadline = None
+
+    def start_sweep(self, message, pages, total_spines, completed=0):
+        # begins going through the spines for one page count
+        self.message(message)
+        self.pages = pages
+        self.total_spines = total_spines
+        self.completed = completed
+        self.best_pages = None
+        self.sweep_start = time.monotonic()
+        self.sweep_tested = 0
+        self.next_report = 0
+        self.report()
+
+    def spine_done(self, count=1):
+        # the only call made for every spine, it does not print unless a report is due
+        self.spines_tested += count
+        self.sweep_tested += count
+        self.completed += count
+        if time.monotonic() >= self.next_report:
+            self.report()
+        self.check_deadline()
+
+    def check_deadline(self):
+        # also called every few thousand partial embeddings inside a single spine, which can take far longer
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTimeout()
+
+    def end_sweep(self):
+        self.report()
+        if self.line_length > 0:
+            print(flush=True)
+            self.line_length = 0
+
+    def report(self):
+        self.next_report = time.monotonic() + self.interval
+        if self.progress is not None:
+            self.progress(self)
+        elif not self.quiet:
+            progress_message = "Graphs Completed: " + str(self.completed) + " / " + str(self.total_spines)
+            if self.best_pages is not None:
+                progress_message += ", Fewest Pages: " + str(self.best_pages)
+            # only the last line is rubbed out, so the output does not grow with the number of reports
+            padding = max(0, self.line_length - len(progress_message)) * " "
+            print("\b" * self.line_length + progress_message + padding, end="", flush=True)
+            self.line_length = len(progress_message + padding)
+
+    def message(self, text):
+        if self.quiet:
+            return
+        if self.line_length > 0:
+            print(flush=True)
+            self.line_length = 0
+        print(text)
+
+    def add_nodes(self, expanded=0, pruned=0, copies=0):
+        self.nodes_expanded += expanded
+        self.nodes_pruned += pruned
+        self.copies_made += copies
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # with stats.phase("search"): ... adds the seconds spent inside to phase_seconds[name]
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0) + time.monotonic() - start
+
+    def get_rate(self):
+        # spines per second in the sweep going on now
+        seconds = time.monotonic() - self.sweep_start
+        if seconds <= 0:
+            return 0
+        return self.sweep_tested / seconds
+
+    def as_dict(self):
+        return {"spines_tested": self.spines_tested, "spines_prefiltered": self.spines_prefiltered,
+                "nodes_expanded": self.nodes_expanded,
+                "nodes_pruned": self.nodes_pruned, "copies_made": self.copies_made,
+                "phase_seconds": dict(self.phase_seconds)}
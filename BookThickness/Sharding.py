@@ -0,0 +1,140 @@
+"""Sharding.py
+@author lmartin5
+
+This file contains the functions that split one n-page search between machines that do not talk to each
+other. The spines of iter_spines are numbered in order (see Permutations.rank_spine), so shard i of N is
+just a range of ranks, and any machine can work out its range and go straight to it. Each shard writes a
+small JSON file saying whether its spines have an n-page embedding, and merge_shard_results puts the files
+together: one embedding anywhere answers the question, and every shard finishing without one proves the
+graph has no n-page embedding. It is run from the command line with "python -m BookThickness search" and
+"python -m BookThickness merge", see __main__.py.
+"""
+
+import json
+import time
+import BookThickness.BookThickness as BookThickness
+import BookThickness.Permutations as Perms
+from BookThickness.Checkpoint import Checkpoint, save_checkpoint
+from BookThickness.EmbeddingState import SpineContext
+
+def parse_shard(text):
+    # reads "i/N" as (i, N)
+    try:
+        shard, num_shards = text.split("/")
+        shard = int(shard)
+        num_shards = int(num_shards)
+    except ValueError:
+        raise Exception("A shard must be written as i/N (ex. 3/8).")
+    Perms.get_shard_range(1, shard, num_shards)
+    return shard, num_shards
+
+def search_shard(edges, n, shard=1, num_shards=1, workers=1, method="coloring", resume=None, prefilter=False):
+    """
+    Searches one shard of the spines for an n-page embedding
+    Parameters:
+        edges: a list of the edges of the graph, as (a, b) with a < b
+        n: an integer, the number of pages
+        shard: an integer, 1 - num_shards
+        num_shards: an integer, the number of shards the spines are split into
+        workers: an integer, the number of processes
+        method: how each spine is searched, one of BookThickness.SPINE_METHODS
+        resume: the path of a checkpoint file for the shard, or None
+        prefilter: True to rule out spines in blocks with Prefilter.py before they are searched
+    Returns:
+        result: a dict with the graph, the number of pages, the shard and its range of ranks, and the
+                "embedding" found (a dict with the "spine" and "pages", a list of [a, b, page]) or None
+    """
+    if method not in BookThickness.SPINE_METHODS:
+        raise Exception("A sharded search needs one of the methods " + str(BookThickness.SPINE_METHODS) + ".")
+    num_vertices = BookThickness.get_num_vertices(edges)
+    start, stop = Perms.get_shard_range(num_vertices, shard, num_shards)
+    checkpoint = None
+    if resume is not None:
+        checkpoint = Checkpoint(resume, edges, {"type": "shard", "method": method, "pages": n, "shard": shard,
+                                                "num_shards": num_shards})
+
+    begin = time.perf_counter()
+    result = {"edges": [list(edge) for edge in edges], "pages": n, "method": method, "shard": shard,
+              "num_shards": num_shards, "start": start, "stop": stop, "embedding": None}
+    if len(edges) == 0:
+        # there are no spines to search, and any number of pages holds a graph without edges (as in SimpleGraph)
+        result["embedding"] = {"spine": [], "pages": []}
+        result["seconds"] = time.perf_counter() - begin
+        return result
+
+    spines = Perms.iter_spine_range(num_vertices, start, stop)
+    book_embedding = BookThickness.find_n_page_embedding(n, edges, spines, workers, method, checkpoint=checkpoint,
+                                                        prefilter=prefilter)
+    result["seconds"] = time.perf_counter() - begin
+    if book_embedding != -1:
+        pages = []
+        for edge, page_number in book_embedding.addedEdges:
+            pages.append([edge[0], edge[1], page_number])
+        pages.sort()
+        result["embedding"] = {"spine": book_embedding.spine, "pages": pages}
+    return result
+
+def save_shard_result(path, result):
+    # written to a temporary file and moved into place, so a file that exists is always a finished shard
+    save_checkpoint(path, result)
+
+def load_shard_result(path):
+    with open(path, "r") as result_file:
+        return json.load(result_file)
+
+def is_valid_embedding(edges, spine, pages, n):
+    # checks a page assignment from a shard file: every edge on a page 1 - n and no crossings on a page
+    assignment = {}
+    for a, b, page_number in pages:
+        assignment[(min(a, b), max(a, b))] = page_number
+    if sorted(spine) != list(range(1, len(spine) + 1)) or set(assignment) != set(edges):
+        return False
+    context = SpineContext(edges, list(spine))
+    for i in range(context.num_edges):
+        page_number = assignment[context.edges[i]]
+        if page_number < 1 or page_number > n:
+            return False
+        for j in range(i + 1, context.num_edges):
+            if context.crossings[i] >> j & 1 and assignment[context.edges[j]] == page_number:
+                return False
+    return True
+
+def merge_shard_results(results):
+    """
+    Puts the results of the shards of one search together
+    Parameters:
+        results: a list of shard results, as given by search_shard
+    Returns:
+        merged: a dict with the graph, the number of pages and "embeddable", which is True with the
+                "embedding" of a shard if one was found, False if every shard finished without one (so
+                there is no n-page embedding), or None with the list of "missing" shards otherwise
+    """
+    if len(results) == 0:
+        raise Exception("There are no shard results to merge.")
+    first = results[0]
+    for result in results:
+        for key in ("edges", "pages", "num_shards"):
+            if result[key] != first[key]:
+                raise Exception("Shard " + str(result["shard"]) + " is from a different search (its " + key + " differ).")
+
+    edges = [tuple(edge) for edge in first["edges"]]
+    merged = {"edges": first["edges"], "pages": first["pages"], "num_shards": first["num_shards"]}
+    for result in sorted(results, key=lambda result: result["shard"]):
+        embedding = result["embedding"]
+        if embedding is None:
+            continue
+        if not is_valid_embedding(edges, embedding["spine"], embedding["pages"], first["pages"]):
+            raise Exception("Shard " + str(result["shard"]) + " has an embedding that is not valid.")
+        merged["embeddable"] = True
+        merged["shard"] = result["shard"]
+        merged["embedding"] = embedding
+        return merged
+
+    done = set(result["shard"] for result in results)
+    missing = [shard for shard in range(1, first["num_shards"] + 1) if shard not in done]
+    if len(missing) > 0:
+        merged["embeddable"] = None
+        merged["missing"] = missing
+    else:
+        merged["embeddable"] = False
+    return merged
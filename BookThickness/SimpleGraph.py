@@ -16,7 +16,17 @@ my_graph = SimpleGraph(edge_set)
 
 import copy
 import itertools
+import time
 import BookThickness.BookThickness as BookThickness
+import BookThickness.Bounds as Bounds
+import BookThickness.Checkpoint as Checkpoint
+import BookThickness.Decomposition as Decomposition
+import BookThickness.Heuristic as Heuristic
+import BookThickness.Permutations as Perms
+import BookThickness.ResultCache as ResultCache
+import BookThickness.Rings as Rings
+import BookThickness.SearchStats as SearchStats
+import BookThickness.Symmetry as Symmetry
 
 class SimpleGraph():
 
@@ -33,12 +43,14 @@ class SimpleGraph():
         self.num_vertices = highest_vertex_number
 
         self.vertices = list(range(1, self.num_vertices + 1))
+        self.canonical_form = None
 
     def verify_edge_set(self, edges):
         edge_set = []
+        seen_edges = set()
 
         for edge in edges:
-            if (type(edge) is not tuple) or (len(edge) is not 2):
+            if (type(edge) is not tuple) or (len(edge) != 2):
                 raise Exception("All edges in a SimpleGraph must be 2-tuples.")
             
             vertex_a = edge[0]
@@ -51,18 +63,14 @@ class SimpleGraph():
                 raise Exception("Only natural numbers can be used as vertices in a SimpleGraph.")
 
             # ignoring any loop edges or repeat edges
-            if vertex_a is not vertex_b:
+            if vertex_a != vertex_b:
                 if vertex_a < vertex_b:
                     new_edge = (vertex_a, vertex_b)
                 else:
                     new_edge = (vertex_b, vertex_a)
 
-                edge_seen = False
-                for seen_edge in edge_set:
-                    if (seen_edge[0] is new_edge[0]) and (seen_edge[1] is new_edge[1]):
-                        edge_seen = True
-
-                if not edge_seen:
+                if new_edge not in seen_edges:
+                    seen_edges.add(new_edge)
                     edge_set.append(new_edge)
 
         self.edges = edge_set
@@ -93,53 +101,470 @@ class SimpleGraph():
         pretty_print += "\b\b}"
         return pretty_print
 
-    def find_book_embedding(self, n=1):
+    def find_book_embedding(self, n=1, workers=1, method="bfs", symmetry=False, bounds=False, decompose=False,
+                            resume=None, cache=False, heuristic=None, stats=None, prefilter=False, time_limit=None):
         # n gives the smallest page number to start searching (i.e. if a complete graph is known to be a subgraph)
+        # workers gives the number of processes the spines are split between
+        # method gives how each spine is searched, either "bfs", "dfs" or "coloring", or "sat" to search the spine
+        # order and the pages together with the built in SAT solver, or "incremental" to sweep the spines
+        # so that each differs from the last by one swap and only update the crossings that changed, or
+        # "prefix" to build the spines one vertex at a time and cut off prefixes that need too many pages
+        # symmetry=True only searches one spine for each orbit under the automorphisms of the graph
+        # bounds=True starts from the lower bounds in Bounds.py when they are higher than n
+        # decompose=True searches each biconnected block on its own and puts the embeddings together
+        # resume can be the path of a checkpoint file, the search is saved to it and picks up where it left off
+        # cache=True looks the graph up in the database of earlier results (see ResultCache.py) and saves the
+        # result to it, cache can also be the path of a database
+        # heuristic can be a number of seconds to look for an embedding with few pages with Heuristic.py first,
+        # the search stops once it gets to that many pages
+        # stats can be a SearchStats (see SearchStats.py) that counts the work done and reports the progress,
+        # SearchStats.SearchStats(quiet=True) prints nothing
+        # prefilter=True rules out spines in blocks with NumPy (see Prefilter.py) before they are searched,
+        # only with the methods "bfs", "dfs" and "coloring"
+        # time_limit can be a number of seconds for the whole call, once it runs out the embedding from the
+        # heuristic (only the greedy start of it if heuristic is None) is returned with isUpperBound=True
         if (type(n) is not int) or (n < 0):
             raise Exception("The number of pages must be an integer >= 0.")
+        self.validate_workers(workers)
+        self.validate_method(method)
+        self.validate_prefilter(prefilter, method)
+        self.validate_time_limit(time_limit, method, decompose)
+        start = time.monotonic()
+        stats = self.open_stats(stats)
+        if self.num_edges == 0:
+            # there are no spines to search, and any number of pages holds a graph without edges
+            stats.message("Graph is embeddable in a " + str(n) + "-page book.")
+            return BookThickness.BookEmbedding(n, [], list(self.vertices))
+        checkpoint = self.open_checkpoint(resume, {"type": "pages", "method": method, "symmetry": symmetry, "spine": None},
+                                          decompose)
+        result_cache = self.open_cache(cache)
+        first_n = n
+
+        make_spines = None
+        if symmetry and method != "sat" and not decompose:
+            make_spines = self.make_symmetric_spine_generator()
 
-        book_embedding = BookThickness.find_book_embedding(n, self.edges)
+        # known_lower is a number of pages the graph is proven to need
+        lower_bound = None
+        known_lower = 0
+        if bounds:
+            with stats.phase("bounds"):
+                lower_bound, reason = self.find_lower_bound()
+            known_lower = lower_bound
+        if result_cache is not None:
+            known_lower = max(known_lower, result_cache.get_lower_bound(self.get_canonical_form()[0]))
+        n = max(n, known_lower)
+
+        book_embedding = self.find_cached_embedding(result_cache, n, stats)
+        if book_embedding is None:
+            if decompose:
+                search = lambda block_edges: SimpleGraph(block_edges).find_book_embedding(n, workers, method, symmetry,
+                                                                                          bounds, cache=cache,
+                                                                                          heuristic=heuristic,
+                                                                                          stats=stats,
+                                                                                          prefilter=prefilter)
+                book_embedding = Decomposition.find_decomposed_embedding(self.vertices, self.edges, search, stats)
+            else:
+                upper_bound = self.find_upper_bound(self.get_heuristic_time(heuristic, time_limit, start), n, stats)
+                search = lambda: BookThickness.find_book_embedding(n, self.edges, workers, method, make_spines,
+                                                                   checkpoint, upper_bound, stats, prefilter)
+                book_embedding = self.run_exact_search(search, upper_bound, n, time_limit, start, stats)
+            if result_cache is not None:
+                num_pages = book_embedding.numPages
+                proven = not book_embedding.isUpperBound and (num_pages > first_n or num_pages <= known_lower)
+                self.save_to_cache(result_cache, book_embedding, proven)
+        self.add_isolated_vertices(book_embedding)
 
-        print("Graph is embeddable in a " + str(book_embedding.numPages) + "-page book.")
+        stats.message("Graph is embeddable in a " + str(book_embedding.numPages) + "-page book.")
+        if lower_bound is not None:
+            self.report_lower_bound(book_embedding, lower_bound, reason, stats)
         return book_embedding
     
-    def find_n_page_embedding(self, n=1, spine=None):
+    def find_book_thickness(self, n=1, symmetry=False, bounds=False, decompose=False, resume=None, cache=False,
+                            heuristic=None, stats=None, prefilter=False, time_limit=None):
+        # goes through the spines once, keeping the spine that needs the fewest pages so far and stopping early
+        # if it gets down to n pages, which should be a number of pages the graph is known to need
+        # bounds=True raises n to the lower bounds in Bounds.py
+        # decompose=True searches each biconnected block on its own and puts the embeddings together
+        # resume can be the path of a checkpoint file, the search is saved to it and picks up where it left off
+        # cache=True looks the graph up in the database of earlier results (see ResultCache.py) and saves the
+        # result to it, cache can also be the path of a database
+        # heuristic can be a number of seconds to look for an embedding with few pages with Heuristic.py first,
+        # then only spines that need fewer pages than it are kept
+        # stats can be a SearchStats (see SearchStats.py) that counts the work done and reports the progress
+        # prefilter=True works out a lower bound for each spine in blocks with NumPy (see Prefilter.py), and
+        # skips the spines that cannot need fewer pages than the best one so far
+        # time_limit can be a number of seconds for the whole call, once it runs out the best embedding found
+        # so far is returned with isUpperBound=True (so the number returned is only an upper bound)
+        # returns the book thickness and a book embedding with that many pages
+        if (type(n) is not int) or (n < 0):
+            raise Exception("The number of pages must be an integer >= 0.")
+        self.validate_time_limit(time_limit, "coloring", decompose)
+        start = time.monotonic()
+        stats = self.open_stats(stats)
+        checkpoint = self.open_checkpoint(resume, {"type": "thickness", "symmetry": symmetry}, decompose)
+        result_cache = self.open_cache(cache)
+        first_n = n
+
+        spines = None
+        if symmetry and not decompose:
+            spines = self.make_symmetric_spine_generator()()
+
+        # known_lower is a number of pages the graph is proven to need
+        lower_bound = None
+        known_lower = 0
+        if bounds:
+            with stats.phase("bounds"):
+                lower_bound, reason = self.find_lower_bound()
+            known_lower = lower_bound
+        if result_cache is not None and self.num_edges > 0:
+            known_lower = max(known_lower, result_cache.get_lower_bound(self.get_canonical_form()[0]))
+        n = max(n, known_lower)
+
+        book_embedding = None
+        if self.num_edges > 0:
+            book_embedding = self.find_cached_embedding(result_cache, n, stats)
+        if book_embedding is None:
+            if decompose:
+                search = lambda block_edges: SimpleGraph(block_edges).find_book_thickness(n, symmetry, bounds, cache=cache,
+                                                                                          heuristic=heuristic,
+                                                                                          stats=stats,
+                                                                                          prefilter=prefilter)[1]
+                book_embedding = Decomposition.find_decomposed_embedding(self.vertices, self.edges, search, stats)
+            else:
+                upper_bound = self.find_upper_bound(self.get_heuristic_time(heuristic, time_limit, start), n, stats)
+                search = lambda: BookThickness.find_minimum_page_embedding(self.edges, n, spines, checkpoint,
+                                                                           upper_bound, stats, prefilter)
+                book_embedding = self.run_exact_search(search, upper_bound, n, time_limit, start, stats)
+            if result_cache is not None and book_embedding != -1:
+                num_pages = book_embedding.numPages
+                proven = not book_embedding.isUpperBound and (num_pages > first_n or num_pages <= known_lower)
+                self.save_to_cache(result_cache, book_embedding, proven)
+        if book_embedding == -1:
+            stats.message("The book thickness of the graph is 0.")
+            return 0, None
+        self.add_isolated_vertices(book_embedding)
+
+        if book_embedding.isUpperBound:
+            stats.message("The book thickness of the graph is at most " + str(book_embedding.numPages) + ".")
+        else:
+            stats.message("The book thickness of the graph is " + str(book_embedding.numPages) + ".")
+        if lower_bound is not None:
+            self.report_lower_bound(book_embedding, lower_bound, reason, stats)
+        return book_embedding.numPages, book_embedding
+
+    def find_n_page_embedding(self, n=1, spine=None, workers=1, method="bfs", dimacs=None, symmetry=False, bounds=False,
+                              decompose=False, resume=None, cache=False, stats=None, prefilter=False):
         # spine can be either None, a single permutation of the vertices, or a list of permutations of the vertices
         # i.e. spine=[1, 2, 4, 5, 3] for a graph with 5 vertices
+        # with method="sat", dimacs can name a file to write the CNF formula to in DIMACS format
+        # symmetry=True only searches one spine for each orbit under the automorphisms of the graph (when no spine is given)
+        # bounds=True skips the search when n is below the lower bounds in Bounds.py
+        # decompose=True searches each biconnected block on its own and puts the embeddings together (when no
+        # spine is given, dimacs is not written)
+        # resume can be the path of a checkpoint file, the search is saved to it and picks up where it left off
+        # cache=True looks the graph up in the database of earlier results (see ResultCache.py) and saves the
+        # result to it, cache can also be the path of a database (only when no spine is given)
+        # stats can be a SearchStats (see SearchStats.py) that counts the work done and reports the progress
+        # prefilter=True rules out spines in blocks with NumPy (see Prefilter.py) before they are searched,
+        # only with the methods "bfs", "dfs" and "coloring"
         if (type(n) is not int) or (n < 0):
             raise Exception("The number of pages must be an integer >= 0.")
+        self.validate_workers(workers)
+        self.validate_method(method)
+        self.validate_prefilter(prefilter, method)
+        stats = self.open_stats(stats)
+        if self.num_edges == 0:
+            stats.message("Graph is embeddable in an " + str(n) + "-page book.")
+            return BookThickness.BookEmbedding(n, [], list(self.vertices))
+        checkpoint = self.open_checkpoint(resume, {"type": "pages", "method": method, "symmetry": symmetry, "spine": spine},
+                                          decompose and spine is None)
+        # a search of some given spines proves nothing about the others, so it is not saved
+        result_cache = None
+        if spine is None:
+            result_cache = self.open_cache(cache)
 
         if spine is not None:
-            if (type(spine) is not list):
-                raise Exception("The spine must be either a single permutation or a list of permutations (ex. [1, 3, 2]).")
-            elif (len(spine) is 0) and (self.num_vertices is not 0):
-                raise Exception("Given spine cannot be an empty list.")
-            elif (len(spine) is 0) and (self.num_vertices is 0):
-                pass
-            elif (type(spine[0]) is list):
-                # list of spines
-                for spine_perm in spine:
-                    self.validate_spine(spine_perm)
-            else:
-                # single spine
-                self.validate_spine(spine)
-                spine = [spine]
+            spine = self.validate_spines(spine)
+        elif symmetry and method != "sat" and not decompose:
+            spine = self.make_symmetric_spine_generator()()
 
-        book_embedding = BookThickness.find_n_page_embedding(n, self.edges, spine)
+        if bounds:
+            with stats.phase("bounds"):
+                lower_bound, reason = self.find_lower_bound()
+            if n < lower_bound:
+                stats.message("Graph needs at least " + str(lower_bound) + " pages (" + reason + ").")
+                stats.message("Graph is not embeddable in an " + str(n) + "-page book.")
+                return -1
 
-        if book_embedding is -1:
-            print("Graph is not embeddable in an " + str(n) + "-page book.")
+        book_embedding = None
+        if result_cache is not None:
+            canon = self.get_canonical_form()[0]
+            if result_cache.is_infeasible(canon, n):
+                stats.message("A saved result shows an isomorphic graph has no " + str(n) + "-page embedding.")
+                book_embedding = -1
+            else:
+                book_embedding = self.find_cached_embedding(result_cache, n, stats)
+        if book_embedding is None:
+            if decompose and spine is None:
+                search = lambda block_edges: SimpleGraph(block_edges).find_n_page_embedding(n, None, workers, method, None,
+                                                                                             symmetry, bounds, cache=cache,
+                                                                                             stats=stats,
+                                                                                             prefilter=prefilter)
+                book_embedding = Decomposition.find_decomposed_embedding(self.vertices, self.edges, search, stats)
+            else:
+                with stats.phase("search"):
+                    book_embedding = BookThickness.find_n_page_embedding(n, self.edges, spine, workers, method, dimacs,
+                                                                         checkpoint, stats, prefilter)
+            if result_cache is not None:
+                if book_embedding == -1:
+                    result_cache.save_infeasible(canon, n)
+                else:
+                    self.save_to_cache(result_cache, book_embedding, False)
+
+        if book_embedding == -1:
+            stats.message("Graph is not embeddable in an " + str(n) + "-page book.")
         else:
-            print("Graph is embeddable in an " + str(n) + "-page book.")
+            self.add_isolated_vertices(book_embedding)
+            stats.message("Graph is embeddable in an " + str(n) + "-page book.")
         return book_embedding
             
+    def iter_n_page_embeddings(self, n=1, spine=None, relabel_pages=False):
+        # generates every n-page embedding one at a time, as (spine, pages) where spine is a tuple and pages
+        # is a tuple with the page number of each edge in self.edges, so they can be written out as they come
+        # spine can be None for every spine (up to flips and rotations, as in Permutations.iter_spines), a
+        # single permutation of the vertices or a list of permutations
+        # relabel_pages=False gives each embedding once up to relabelling the pages (the pages are numbered in
+        # the order the edges first use them), True gives every labelling of the pages
+        if (type(n) is not int) or (n < 0):
+            raise Exception("The number of pages must be an integer >= 0.")
+        if spine is not None:
+            spine = self.validate_spines(spine)
+        return BookThickness.iter_n_page_embeddings(n, self.edges, self.num_vertices, spine, not relabel_pages)
+
+    def count_embeddable_spines(self, n=1, spine=None):
+        # counts the spines that have at least one n-page embedding, spine is as in iter_n_page_embeddings
+        if (type(n) is not int) or (n < 0):
+            raise Exception("The number of pages must be an integer >= 0.")
+        if spine is not None:
+            spine = self.validate_spines(spine)
+        return BookThickness.count_embeddable_spines(n, self.edges, self.num_vertices, spine)
+
+    def find_heuristic_embedding(self, time_limit=10, seed=None, target=None, stats=None):
+        # looks for an embedding with few pages for time_limit seconds with Heuristic.py, without proving it
+        # has the fewest pages, and returns the best BookEmbedding it found
+        # it can be stopped early with Ctrl+C and still returns the best one so far
+        # seed fixes the random choices of the search
+        # target is a number of pages to stop at, the lower bound in Bounds.py by default
+        # stats can be a SearchStats (see SearchStats.py), the time taken is added to its "heuristic" phase
+        if (type(time_limit) is not int and type(time_limit) is not float) or (time_limit < 0):
+            raise Exception("The time limit must be a number of seconds >= 0.")
+        stats = self.open_stats(stats)
+        # everything here counts against time_limit, including the lower bound and building the BookEmbedding
+        start = time.monotonic()
+        if target is None:
+            target = self.find_lower_bound()[0]
+
+        best = None
+        search = Heuristic.HeuristicSearch(self.edges, self.num_vertices, seed)
+        with stats.phase("heuristic"):
+            try:
+                for best in search.iter_improvements(max(0, start + time_limit - time.monotonic()), target):
+                    stats.message("Heuristic found a " + str(best[0]) + "-page embedding.")
+            except KeyboardInterrupt:
+                stats.message("Heuristic stopped.")
+        if best is None:
+            # only a graph without edges gives nothing
+            return BookThickness.BookEmbedding(0, [], list(self.vertices))
+        book_embedding = BookThickness.embedding_from_pages(best[0], self.edges, best[1], best[2])
+        self.add_isolated_vertices(book_embedding)
+        return book_embedding
+
+    def find_upper_bound(self, heuristic, target, stats):
+        # the embedding from the heuristic when heuristic is a number of seconds, or None
+        if heuristic is None or self.num_edges == 0:
+            return None
+        return self.find_heuristic_embedding(heuristic, target=target, stats=stats)
+
+    def add_isolated_vertices(self, book_embedding):
+        # the searches only see the vertices on edges, so the vertices on no edge (i.e. ring elements in a
+        # total_graph) are put at the end of the spine, where they cannot block any edge
+        on_spine = set(book_embedding.spine)
+        missing = [vertex for vertex in self.vertices if vertex not in on_spine]
+        if len(missing) == 0:
+            return
+        book_embedding.spine = list(book_embedding.spine) + missing
+        book_embedding.verts = len(book_embedding.spine)
+        for vertex in missing:
+            book_embedding.positions[vertex] = book_embedding.spine.index(vertex)
+
+    def get_heuristic_time(self, heuristic, time_limit, start):
+        # the seconds for the heuristic, a search with a time limit always runs at least its greedy start so
+        # there is an embedding to return when the time runs out, and never runs past the time limit
+        if time_limit is None:
+            return heuristic
+        remaining = max(0, start + time_limit - time.monotonic())
+        if heuristic is None:
+            return 0
+        return min(heuristic, remaining)
+
+    def run_exact_search(self, search, upper_bound, n, time_limit, start, stats):
+        # search is a function running the exact search, it is skipped when the heuristic embedding already has
+        # n pages (a number of pages the graph is known to need), and it is stopped at start + time_limit
+        if upper_bound is not None and upper_bound.numPages <= n:
+            stats.message("The heuristic embedding reaches the lower bound, so no search is needed.")
+            return upper_bound
+        if time_limit is not None:
+            stats.deadline = start + time_limit
+        try:
+            with stats.phase("search"):
+                book_embedding = search()
+        except SearchStats.SearchTimeout:
+            stats.end_sweep()
+            upper_bound.isUpperBound = True
+            book_embedding = upper_bound
+        finally:
+            stats.deadline = None
+        if book_embedding != -1 and book_embedding.isUpperBound:
+            stats.message("The time limit ran out before the search finished, so the embedding is only an upper bound.")
+        return book_embedding
+
+    def open_stats(self, stats):
+        # a SearchStats that prints the progress and the results when none is given
+        if stats is None:
+            return SearchStats.SearchStats()
+        if type(stats) is not SearchStats.SearchStats:
+            raise Exception("The stats must be a SearchStats (see SearchStats.py).")
+        return stats
+
+    def open_checkpoint(self, resume, search, decompose):
+        # search holds the settings that decide the order of the spines, see Checkpoint.py
+        if resume is None:
+            return None
+        if decompose:
+            raise Exception("A search with decompose=True cannot be resumed.")
+        if search.get("method") in ("sat", "prefix"):
+            raise Exception("A search with method " + search["method"] + " cannot be resumed.")
+        if search.get("symmetry"):
+            # so a checkpoint from an older order of the symmetric spines is refused instead of skipping the wrong spines
+            search = dict(search, spine_order=Perms.SYMMETRIC_SPINE_ORDER)
+        return Checkpoint.Checkpoint(resume, self.edges, search)
+
+    def open_cache(self, cache):
+        # cache can be True for the database in the cache directory, or the path of a database
+        if cache is False or cache is None:
+            return None
+        if cache is True:
+            return ResultCache.ResultCache()
+        if type(cache) is str:
+            return ResultCache.ResultCache(cache)
+        raise Exception("The cache must be True, False or the path of a database.")
+
+    def get_canonical_form(self):
+        # returns (canonical form, canonical labelling), see Symmetry.get_canonical_form
+        # it is only worked out once for each graph
+        if self.canonical_form is None:
+            self.canonical_form = Symmetry.get_canonical_form(self.vertices, self.edges)
+        return self.canonical_form
+
+    def find_cached_embedding(self, result_cache, n, stats):
+        # an n-page embedding built from a saved embedding of an isomorphic graph with at most n pages, or None
+        if result_cache is None:
+            return None
+        canon, order = self.get_canonical_form()
+        saved = result_cache.get_embedding(canon, order, n)
+        if saved is None:
+            return None
+        stats.message("Found a saved " + str(saved[0]) + "-page embedding of an isomorphic graph.")
+        return BookThickness.embedding_from_pages(n, self.edges, saved[1], saved[2])
+
+    def save_to_cache(self, result_cache, book_embedding, fewer_pages_fail):
+        # fewer_pages_fail says whether the search also showed there is no embedding with one page less
+        canon, order = self.get_canonical_form()
+        result_cache.save_embedding(canon, order, book_embedding.numPages, book_embedding.spine,
+                                    dict(book_embedding.addedEdges))
+        if fewer_pages_fail and book_embedding.numPages > 1:
+            result_cache.save_infeasible(canon, book_embedding.numPages - 1)
+
+    def find_lower_bound(self):
+        # returns (bound, reason), see Bounds.py
+        return Bounds.find_lower_bound(self.vertices, self.edges)
+
+    def report_lower_bound(self, book_embedding, lower_bound, reason, stats):
+        book_embedding.lowerBound = lower_bound
+        book_embedding.isBoundTight = (book_embedding.numPages == lower_bound)
+        if book_embedding.isBoundTight:
+            stats.message("The lower bound of " + str(lower_bound) + " pages (" + reason + ") was tight.")
+        elif book_embedding.isUpperBound:
+            stats.message("The lower bound is " + str(lower_bound) + " pages (" + reason + ").")
+        else:
+            stats.message("The lower bound of " + str(lower_bound) + " pages (" + reason + ") was not tight.")
+
+    def validate_spines(self, spine):
+        # spine can be a single permutation or a list of permutations, returns a list of permutations
+        if (type(spine) is not list):
+            raise Exception("The spine must be either a single permutation or a list of permutations (ex. [1, 3, 2]).")
+        elif (len(spine) == 0) and (self.num_vertices != 0):
+            raise Exception("Given spine cannot be an empty list.")
+        elif (len(spine) == 0) and (self.num_vertices == 0):
+            return spine
+        elif (type(spine[0]) is list):
+            # list of spines
+            for spine_perm in spine:
+                self.validate_spine(spine_perm)
+            return spine
+        else:
+            # single spine
+            self.validate_spine(spine)
+            return [spine]
+
     def validate_spine(self, spine):
-        if (len(spine) is not self.num_vertices):
+        if (len(spine) != self.num_vertices):
             raise Exception("The length of the spine must equal the number of vertices.")
         for vert in self.vertices:
             if (vert not in spine):
                 raise Exception("Each vertex must appear exactly once in the spine.")
 
+    def find_twin_classes(self):
+        return Symmetry.find_twin_classes(self.vertices, self.edges)
+
+    def find_automorphism_generators(self):
+        return Symmetry.find_automorphism_generators(self.vertices, self.edges)
+
+    def make_symmetric_spine_generator(self):
+        # the symmetries are only found once, the returned function gives a new generator of spines each call
+        twin_classes = self.find_twin_classes()
+        generators = self.find_automorphism_generators()
+        if len(generators) == 0 and len(twin_classes) == self.num_vertices:
+            # a graph with no symmetries at all has nothing to cut down, so the plain spines are much faster
+            return lambda: Perms.iter_spines(self.num_vertices)
+        automorphisms = Symmetry.get_twin_quotient_automorphisms(generators, twin_classes)
+        return lambda: Perms.iter_symmetric_spines(twin_classes, automorphisms)
+
+    def validate_workers(self, workers):
+        if (type(workers) is not int) or (workers < 1):
+            raise Exception("The number of workers must be an integer >= 1.")
+
+    def validate_method(self, method):
+        if method not in BookThickness.SEARCH_METHODS:
+            raise Exception("The method must be one of " + ", ".join(BookThickness.SEARCH_METHODS) + ".")
+
+    def validate_time_limit(self, time_limit, method, decompose):
+        # the time limit is checked after every spine, so it needs a search that goes a spine at a time
+        if time_limit is None:
+            return
+        if (type(time_limit) is not int and type(time_limit) is not float) or (time_limit < 0):
+            raise Exception("The time limit must be a number of seconds >= 0.")
+        if decompose:
+            raise Exception("A search with decompose=True cannot have a time limit.")
+        if method in ("sat", "prefix"):
+            raise Exception("The method " + method + " cannot have a time limit.")
+
+    def validate_prefilter(self, prefilter, method):
+        # the prefilter rules out spines one at a time, so it only fits the methods that search a spine at a time
+        if prefilter and method not in BookThickness.SPINE_METHODS:
+            raise Exception("The prefilter only works with the methods " + ", ".join(BookThickness.SPINE_METHODS) + ".")
+
     def complete_graph(n):
         if (type(n) is not int) or (n < 0):
             raise Exception("The complete graph requires an integer >= 0.")    
@@ -162,4 +587,14 @@ class SimpleGraph():
         for element in itertools.product(set_a, set_b):
             edge_set.append(element)
 
-        return SimpleGraph(edge_set)
\ No newline at end of file
+        return SimpleGraph(edge_set)
+
+    def total_graph(ring):
+        # the total graph of a finite commutative ring, a product of Z_n and F_q, see Rings.py
+        # i.e. SimpleGraph.total_graph("Z3xZ3") or SimpleGraph.total_graph([("Z", 2), ("F", 4)])
+        num_vertices, edge_set = Rings.get_total_graph_edges(ring)
+        graph = SimpleGraph(edge_set)
+        # elements adjacent to nothing are still vertices of the graph
+        graph.num_vertices = num_vertices
+        graph.vertices = list(range(1, num_vertices + 1))
+        return graph
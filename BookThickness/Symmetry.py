@@ -0,0 +1,274 @@
+"""Symmetry.py
+@author lmartin5
+
+This file contains the functions that find the symmetries of a graph, so that spines which are
+images of each other under an automorphism are only searched once. Twin classes (vertices with the
+same neighbours apart from each other) are found directly, since any reordering of a twin class is an
+automorphism. Other automorphisms are found with an individualization-refinement search, which gives
+a set of generators for the automorphism group. Permutations.iter_symmetric_spines uses both to
+generate one spine per orbit. The same search, run over the whole tree, gives a canonical labelling,
+so isomorphic graphs can be recognised (see ResultCache.py).
+"""
+
+def get_adjacency(vertices, edges):
+    adjacency = {}
+    for vert in vertices:
+        adjacency[vert] = set()
+    for edge in edges:
+        adjacency[edge[0]].add(edge[1])
+        adjacency[edge[1]].add(edge[0])
+    return adjacency
+
+def find_twin_classes(vertices, edges):
+    """
+    Finds the twin classes of a graph
+    Parameters:
+        vertices: a list of the vertices of the graph
+        edges: a list of the edges of the graph
+    Returns:
+        classes: a list of sorted lists of vertices, every vertex is in exactly one class
+                 two vertices are in the same class when they have the same neighbours (false twins)
+                 or the same neighbours once they are counted as their own neighbours (true twins)
+    """
+    adjacency = get_adjacency(vertices, edges)
+    false_twins = {}
+    true_twins = {}
+    for vert in vertices:
+        false_twins.setdefault(frozenset(adjacency[vert]), []).append(vert)
+        true_twins.setdefault(frozenset(adjacency[vert] | {vert}), []).append(vert)
+
+    # a vertex cannot have both a false twin and a true twin, so the nontrivial classes never overlap
+    class_of = {}
+    for group in list(false_twins.values()) + list(true_twins.values()):
+        if len(group) > 1:
+            for vert in group:
+                class_of[vert] = group
+
+    classes = []
+    placed = set()
+    for vert in vertices:
+        if vert not in placed:
+            group = sorted(class_of.get(vert, [vert]))
+            classes.append(group)
+            placed.update(group)
+    return classes
+
+def refine_partition(adjacency, cells):
+    # colour refinement of an ordered partition (a list of cells), splits every cell by how many neighbours
+    # its vertices have in each cell until nothing changes. The order of the new cells only depends on
+    # the structure of the graph and not on the vertex labels.
+    while (True):
+        cell_of = {}
+        for i in range(len(cells)):
+            for vert in cells[i]:
+                cell_of[vert] = i
+
+        new_cells = []
+        for cell in cells:
+            if len(cell) == 1:
+                new_cells.append(cell)
+                continue
+            groups = {}
+            for vert in cell:
+                signature = tuple(sorted(cell_of[other] for other in adjacency[vert]))
+                groups.setdefault(signature, []).append(vert)
+            for signature in sorted(groups):
+                new_cells.append(groups[signature])
+
+        if len(new_cells) == len(cells):
+            return new_cells
+        cells = new_cells
+
+def individualize(cells, vert):
+    new_cells = []
+    for cell in cells:
+        if vert in cell:
+            new_cells.append([vert])
+            new_cells.append([other for other in cell if other != vert])
+        else:
+            new_cells.append(cell)
+    return new_cells
+
+def get_target_cell(cells):
+    for cell in cells:
+        if len(cell) > 1:
+            return cell
+    return None
+
+def get_leaf_certificate(adjacency, cells):
+    # the edge set of the graph relabelled by the order of a discrete partition
+    position = {}
+    for i in range(len(cells)):
+        position[cells[i][0]] = i
+    certificate = []
+    for vert in adjacency:
+        for other in adjacency[vert]:
+            if position[vert] < position[other]:
+                certificate.append((position[vert], position[other]))
+    certificate.sort()
+    return certificate
+
+def find_automorphism_generators(vertices, edges):
+    """
+    Finds generators of the automorphism group of a graph
+    Parameters:
+        vertices: a list of the vertices of the graph
+        edges: a list of the edges of the graph
+    Returns:
+        generators: a list of automorphisms, each a dict mapping every vertex to its image
+    """
+    adjacency = get_adjacency(vertices, edges)
+    if len(vertices) == 0:
+        return []
+
+    # the first path of the search tree always individualizes the first vertex of the target cell
+    path = [refine_partition(adjacency, [list(vertices)])]
+    choices = []
+    while get_target_cell(path[-1]) is not None:
+        choices.append(get_target_cell(path[-1])[0])
+        path.append(refine_partition(adjacency, individualize(path[-1], choices[-1])))
+    first_order = [cell[0] for cell in path[-1]]
+    first_certificate = get_leaf_certificate(adjacency, path[-1])
+
+    # going up the first path, every automorphism found so far fixes the vertices chosen above the current
+    # level, so a vertex already in the orbit of the chosen one cannot give anything new
+    generators = []
+    for level in reversed(range(len(choices))):
+        orbit_of = get_orbits(vertices, generators)
+        for vert in get_target_cell(path[level]):
+            if orbit_of[vert] == orbit_of[choices[level]]:
+                continue
+            cells = refine_partition(adjacency, individualize(path[level], vert))
+            order = search_equivalent_leaf(adjacency, cells, level + 1, path, first_certificate)
+            if order is not None:
+                automorphism = {}
+                for i in range(len(order)):
+                    automorphism[first_order[i]] = order[i]
+                generators.append(automorphism)
+                orbit_of = get_orbits(vertices, generators)
+    return generators
+
+def search_equivalent_leaf(adjacency, cells, depth, path, first_certificate):
+    # depth first search below a node for a leaf with the same certificate as the first leaf
+    if [len(cell) for cell in cells] != [len(cell) for cell in path[depth]]:
+        return None
+    target = get_target_cell(cells)
+    if target is None:
+        if get_leaf_certificate(adjacency, cells) == first_certificate:
+            return [cell[0] for cell in cells]
+        return None
+    for vert in target:
+        order = search_equivalent_leaf(adjacency, refine_partition(adjacency, individualize(cells, vert)),
+                                       depth + 1, path, first_certificate)
+        if order is not None:
+            return order
+    return None
+
+def find_canonical_labelling(vertices, edges):
+    """
+    Finds a canonical labelling of a graph, which is the same for every relabelling of the graph
+    Parameters:
+        vertices: a list of the vertices of the graph
+        edges: a list of the edges of the graph
+    Returns:
+        (certificate, order) where certificate is the edge list of the graph relabelled canonically (labels 1 - n),
+        and order[i] is the vertex of the graph that gets the canonical label i + 1
+        two graphs are isomorphic exactly when their certificates (and numbers of vertices) are equal
+    """
+    adjacency = get_adjacency(vertices, edges)
+    if len(vertices) == 0:
+        return [], []
+    generators = find_automorphism_generators(vertices, edges)
+    cells = refine_partition(adjacency, [list(vertices)])
+    certificate, order = search_canonical_leaf(adjacency, cells, [], generators)
+    return [(a + 1, b + 1) for a, b in certificate], order
+
+def search_canonical_leaf(adjacency, cells, path, generators):
+    # the leaf below this node with the smallest certificate, children that an automorphism fixing the
+    # individualized vertices maps onto each other have the same leaves, so only one of them is searched
+    target = get_target_cell(cells)
+    if target is None:
+        return get_leaf_certificate(adjacency, cells), [cell[0] for cell in cells]
+
+    fixing = [automorphism for automorphism in generators if all(automorphism[vert] == vert for vert in path)]
+    orbit_of = get_orbits(list(adjacency), fixing)
+    searched_orbits = set()
+    best = None
+    for vert in target:
+        if orbit_of[vert] in searched_orbits:
+            continue
+        searched_orbits.add(orbit_of[vert])
+        leaf = search_canonical_leaf(adjacency, refine_partition(adjacency, individualize(cells, vert)),
+                                     path + [vert], generators)
+        if best is None or leaf[0] < best[0]:
+            best = leaf
+    return best
+
+def get_canonical_form(vertices, edges):
+    # a string that is the same for exactly the graphs isomorphic to this one, and the labelling it came from
+    certificate, order = find_canonical_labelling(vertices, edges)
+    form = str(len(vertices)) + ":" + ",".join(str(a) + "-" + str(b) for a, b in certificate)
+    return form, order
+
+def get_orbits(vertices, automorphisms):
+    # maps every vertex to a representative of its orbit under the group the automorphisms generate
+    parent = {}
+    for vert in vertices:
+        parent[vert] = vert
+
+    def find(vert):
+        while parent[vert] != vert:
+            parent[vert] = parent[parent[vert]]
+            vert = parent[vert]
+        return vert
+
+    for automorphism in automorphisms:
+        for vert in vertices:
+            a = find(vert)
+            b = find(automorphism[vert])
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+    orbit_of = {}
+    for vert in vertices:
+        orbit_of[vert] = find(vert)
+    return orbit_of
+
+def get_twin_quotient_automorphisms(generators, twin_classes, limit=5000):
+    """
+    Lists the automorphisms that are needed once twin classes are taken care of
+    Parameters:
+        generators: a list of automorphisms, as returned by find_automorphism_generators
+        twin_classes: a list of twin classes, as returned by find_twin_classes
+        limit: an integer, the most automorphisms that will be listed
+    Returns:
+        automorphisms: a list of automorphisms (dicts), one for each way the group permutes the twin classes
+                       (reordering vertices inside twin classes is already handled separately)
+                       if there are more than limit of these, only limit of them are returned, which
+                       means less pruning but never a missed spine
+    """
+    class_of = {}
+    for i in range(len(twin_classes)):
+        for vert in twin_classes[i]:
+            class_of[vert] = i
+
+    def class_permutation(automorphism):
+        return tuple(class_of[automorphism[twin_class[0]]] for twin_class in twin_classes)
+
+    identity = {}
+    for vert in class_of:
+        identity[vert] = vert
+    found = {class_permutation(identity): identity}
+    queue = [identity]
+    for automorphism in queue:
+        for generator in generators:
+            if len(found) >= limit:
+                return list(found.values())
+            product = {}
+            for vert in automorphism:
+                product[vert] = generator[automorphism[vert]]
+            key = class_permutation(product)
+            if key not in found:
+                found[key] = product
+                queue.append(product)
+    return list(found.values())
@@ -0,0 +1,187 @@
+"""__main__.py
+@author lmartin5
+
+This file contains the command line interface, run with "python -m BookThickness". The batch command
+reads graphs as JSONL (one edge list per line) and writes one JSON result per line as each graph is done.
+The search command tests one graph for an n-page embedding, or only one shard of its spines, and the
+merge command puts the results of the shards together (see Sharding.py). The bench command runs the
+benchmarks in Benchmark.py.
+
+ex.
+python -m BookThickness batch --workers 8 graphs.jsonl > results.jsonl
+python -m BookThickness search graph.json --pages 3 --shard 2/8 -o shard-2.json
+python -m BookThickness merge shard-*.json
+python -m BookThickness bench -o results.json --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import BookThickness.BookThickness as BookThickness
+import BookThickness.Batch as Batch
+import BookThickness.Benchmark as Benchmark
+import BookThickness.Sharding as Sharding
+from BookThickness.SimpleGraph import SimpleGraph
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="python -m BookThickness", description="Searches for book embeddings of graphs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="find the book thickness of every graph in a JSONL stream")
+    batch.add_argument("input", nargs="?", default="-", help="JSONL file of graphs, or - for standard input (default)")
+    batch.add_argument("-o", "--output", default="-", help="file to write the results to, or - for standard output (default)")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of processes (default: one per CPU)")
+    batch.add_argument("--window", type=int, default=None,
+                       help="number of graphs read ahead to pick the smallest from (default: 4 per worker)")
+    batch.add_argument("--method", choices=BookThickness.SEARCH_METHODS, default="coloring",
+                       help="how the spines are searched (default: coloring)")
+    batch.add_argument("--symmetry", action="store_true", help="only search one spine for each orbit of automorphisms")
+    batch.add_argument("--decompose", action="store_true", help="search each biconnected block on its own")
+    batch.add_argument("--no-bounds", action="store_true", help="do not start from the lower bounds in Bounds.py")
+    batch.add_argument("--cache", nargs="?", const=True, default=False,
+                       help="look graphs up in the database of earlier results, optionally giving its path")
+    batch.add_argument("--heuristic", type=float, default=None, metavar="SECONDS",
+                       help="look for an embedding with few pages for this long first and stop the search at it")
+    batch.add_argument("--prefilter", action="store_true", help="rule out spines in blocks with NumPy before searching them")
+
+    search = commands.add_parser("search", help="test one graph for an n-page embedding, or one shard of its spines")
+    search.add_argument("input", help="JSON file with a list of edges, or an object with an \"edges\" list")
+    search.add_argument("--pages", type=int, required=True, help="the number of pages to test")
+    search.add_argument("--shard", default="1/1", help="only search shard i of N of the spines, written i/N (default: 1/1)")
+    search.add_argument("-o", "--output", default=None,
+                        help="file to write the shard result to (default: shard-i-of-N.json)")
+    search.add_argument("--workers", type=int, default=1, help="number of processes (default: 1)")
+    search.add_argument("--method", choices=BookThickness.SPINE_METHODS, default="coloring",
+                        help="how the spines are searched (default: coloring)")
+    search.add_argument("--resume", default=None, help="checkpoint file to save the progress of the shard to")
+    search.add_argument("--prefilter", action="store_true", help="rule out spines in blocks with NumPy before searching them")
+
+    merge = commands.add_parser("merge", help="put the results of the shards of a search together")
+    merge.add_argument("inputs", nargs="+", help="the result files of the shards")
+    merge.add_argument("-o", "--output", default="-", help="file to write the merged result to, or - for standard output (default)")
+
+    bench = commands.add_parser("bench", help="run the benchmarks and compare them with a baseline")
+    bench.add_argument("workloads", nargs="*", help="the workloads to run (default: all of them)")
+    bench.add_argument("--list", action="store_true", help="list the workloads and stop")
+    bench.add_argument("--repeat", type=int, default=3, help="runs of each workload, the fastest is kept (default: 3)")
+    bench.add_argument("-o", "--output", default=None, help="file to save the results to as JSON")
+    bench.add_argument("--baseline", default=None, help="JSON results to compare with, the command fails if a workload is slower")
+    bench.add_argument("--tolerance", type=float, default=0.1,
+                       help="how much slower or bigger a workload can be than the baseline, as a fraction (default: 0.1)")
+    bench.add_argument("--update-baseline", action="store_true",
+                       help="save the results to the baseline file, accepting workloads whose number of nodes changed")
+    return parser
+
+def run_batch_command(arguments):
+    if arguments.workers < 1:
+        raise Exception("The number of workers must be an integer >= 1.")
+    options = {"method": arguments.method, "symmetry": arguments.symmetry, "decompose": arguments.decompose,
+               "bounds": not arguments.no_bounds, "cache": arguments.cache, "heuristic": arguments.heuristic,
+               "prefilter": arguments.prefilter}
+
+    input_file = sys.stdin if arguments.input == "-" else open(arguments.input, "r")
+    output_file = sys.stdout if arguments.output == "-" else open(arguments.output, "w")
+    try:
+        num_graphs = Batch.run_batch(input_file, output_file, arguments.workers, arguments.window, options)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print("Searched " + str(num_graphs) + " graphs.", file=sys.stderr)
+
+def run_search_command(arguments):
+    if arguments.workers < 1:
+        raise Exception("The number of workers must be an integer >= 1.")
+    shard, num_shards = Sharding.parse_shard(arguments.shard)
+    with open(arguments.input, "r") as input_file:
+        record = json.load(input_file)
+    if type(record) is dict:
+        record = record.get("edges", [])
+    graph = SimpleGraph([tuple(edge) for edge in record])
+
+    # the progress of the search goes to standard error, so the result can be piped
+    sys.stdout, stdout = sys.stderr, sys.stdout
+    try:
+        result = Sharding.search_shard(graph.edges, arguments.pages, shard, num_shards, arguments.workers,
+                                       arguments.method, arguments.resume, arguments.prefilter)
+    finally:
+        sys.stdout = stdout
+    output = arguments.output
+    if output is None:
+        output = "shard-" + str(shard) + "-of-" + str(num_shards) + ".json"
+    Sharding.save_shard_result(output, result)
+    if result["embedding"] is None:
+        print("Shard " + str(shard) + "/" + str(num_shards) + " has no " + str(arguments.pages) + "-page embedding.",
+              file=sys.stderr)
+    else:
+        print("Shard " + str(shard) + "/" + str(num_shards) + " found a " + str(arguments.pages) + "-page embedding.",
+              file=sys.stderr)
+
+def run_merge_command(arguments):
+    results = [Sharding.load_shard_result(path) for path in arguments.inputs]
+    merged = Sharding.merge_shard_results(results)
+    if arguments.output == "-":
+        print(json.dumps(merged))
+    else:
+        with open(arguments.output, "w") as output_file:
+            output_file.write(json.dumps(merged) + "\n")
+
+    pages = str(merged["pages"])
+    if merged["embeddable"] is True:
+        print("Graph is embeddable in a " + pages + "-page book (found by shard " + str(merged["shard"]) + ").",
+              file=sys.stderr)
+    elif merged["embeddable"] is False:
+        print("Graph is not embeddable in a " + pages + "-page book (all " + str(merged["num_shards"]) +
+              " shards searched).", file=sys.stderr)
+    else:
+        print("No " + pages + "-page embedding found yet, shards " + str(merged["missing"]) + " are missing.",
+              file=sys.stderr)
+
+def run_bench_command(arguments):
+    if arguments.list:
+        for name in Benchmark.WORKLOADS:
+            print(name)
+        return 0
+    if arguments.update_baseline and arguments.baseline is None:
+        raise Exception("--update-baseline needs the --baseline file to update.")
+    baseline = None
+    if arguments.baseline is not None and os.path.exists(arguments.baseline):
+        baseline = Benchmark.load_results(arguments.baseline)
+    elif arguments.baseline is not None and not arguments.update_baseline:
+        raise Exception("There is no baseline file " + arguments.baseline + ".")
+
+    names = arguments.workloads if len(arguments.workloads) > 0 else None
+    results = Benchmark.run_benchmarks(names, arguments.repeat,
+                                       lambda name, result: print(Benchmark.format_result(name, result), flush=True))
+    if arguments.output is not None:
+        Benchmark.save_results(arguments.output, results)
+    if arguments.update_baseline:
+        Benchmark.save_results(arguments.baseline, Benchmark.update_baseline(baseline, results))
+    if baseline is None:
+        return 0
+
+    print()
+    rows, passed = Benchmark.compare_results(results, baseline, arguments.tolerance, arguments.update_baseline)
+    for row in rows:
+        print(Benchmark.format_comparison(row))
+    if not passed:
+        print("Some workloads are more than " + format(arguments.tolerance, ".0%") + " slower or bigger than the baseline,"
+              + " or did a different number of nodes (run with --update-baseline to accept that).")
+        return 1
+    return 0
+
+def main():
+    arguments = get_parser().parse_args()
+    if arguments.command == "batch":
+        run_batch_command(arguments)
+    elif arguments.command == "search":
+        run_search_command(arguments)
+    elif arguments.command == "merge":
+        run_merge_command(arguments)
+    elif arguments.command == "bench":
+        sys.exit(run_bench_command(arguments))
+
+if __name__ == "__main__":
+    main()
@@ -45,4 +45,5 @@ def main():
     embedding = z3xz3_total_graph.find_book_embedding(n=3)
     print(embedding)
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""test_cross_checks.py
+@author lmartin5
+
+This file contains the tests that check the newer searches against the baseline breadth first search
+(and against plain brute force for the smallest graphs), on every graph small enough for the baseline
+to go through all of its spines (up to 7 vertices). Run them with "python -m pytest -q" from the top
+of the repository.
+"""
+
+import itertools
+import random
+import pytest
+import BookThickness.BookThickness as BookThickness
+import BookThickness.Bounds as Bounds
+import BookThickness.Permutations as Perms
+import BookThickness.Sharding as Sharding
+import BookThickness.Symmetry as Symmetry
+from BookThickness.EmbeddingState import SpineContext
+from BookThickness.SearchStats import SearchStats
+from BookThickness.SimpleGraph import SimpleGraph
+
+METHODS = ("bfs", "dfs", "coloring", "incremental", "prefix", "sat")
+
+def make_random_graphs(count, max_vertices, seed):
+    # graphs on 1 - num_vertices with every vertex on an edge, so the searches see all of them
+    generator = random.Random(seed)
+    graphs = []
+    while len(graphs) < count:
+        num_vertices = generator.randint(max(2, max_vertices - 3), max_vertices)
+        density = generator.choice([0.3, 0.5, 0.8])
+        edges = [edge for edge in itertools.combinations(range(1, num_vertices + 1), 2) if generator.random() < density]
+        if len(set(vert for edge in edges for vert in edge)) == num_vertices:
+            graphs.append(edges)
+    return graphs
+
+def fits_in_pages(edges, spine, n):
+    # plain brute force over every page assignment of a spine
+    context = SpineContext(edges, list(spine))
+    for pages in itertools.product(range(1, n + 1), repeat=context.num_edges):
+        if all(pages[i] != pages[j] for i in range(context.num_edges) for j in range(i + 1, context.num_edges)
+               if context.crossings[i] >> j & 1):
+            return True
+    return context.num_edges == 0
+
+def baseline_embeddable(edges, n):
+    # the baseline engine, breadth first on every spine
+    num_vertices = BookThickness.get_num_vertices(edges)
+    for spine in Perms.iter_spines(num_vertices):
+        if BookThickness.find_n_page_embedding_with_spine(n, edges, spine, "bfs") != -1:
+            return True
+    return False
+
+def baseline_thickness(edges):
+    n = 1
+    while not baseline_embeddable(edges, n):
+        n += 1
+    return n
+
+def is_valid(edges, book_embedding, n):
+    pages = [[edge[0], edge[1], page_number] for edge, page_number in book_embedding.addedEdges]
+    return Sharding.is_valid_embedding(edges, book_embedding.spine, pages, n)
+
+def test_rank_and_unrank_round_trip():
+    for num_vertices in range(1, 8):
+        spines = list(Perms.iter_spines(num_vertices))
+        assert len(spines) == Perms.count_spines(num_vertices)
+        for rank in range(len(spines)):
+            assert Perms.rank_spine(spines[rank]) == rank
+            assert Perms.unrank_spine(rank, num_vertices) == spines[rank]
+        total = len(spines)
+        assert list(Perms.iter_spine_range(num_vertices, total // 3, total)) == spines[total // 3:]
+
+def test_bfs_matches_brute_force_on_each_spine():
+    for edges in make_random_graphs(20, 5, 1):
+        for spine in Perms.iter_spines(BookThickness.get_num_vertices(edges)):
+            for n in (1, 2):
+                found = BookThickness.find_n_page_embedding_with_spine(n, edges, spine, "bfs") != -1
+                assert found == fits_in_pages(edges, spine, n)
+
+@pytest.mark.parametrize("method", METHODS)
+def test_methods_match_bfs(method):
+    # K6 and K3,3 need 3 pages
+    graphs = make_random_graphs(12, 7, 2)
+    graphs += [SimpleGraph.complete_graph(6).edges, SimpleGraph.complete_bipartite_graph(3, 3).edges]
+    for edges in graphs:
+        graph = SimpleGraph(edges)
+        for n in (1, 2, 3):
+            book_embedding = graph.find_n_page_embedding(n, method=method, stats=SearchStats(quiet=True))
+            assert (book_embedding != -1) == baseline_embeddable(edges, n)
+            if book_embedding != -1:
+                assert is_valid(graph.edges, book_embedding, n)
+
+@pytest.mark.parametrize("symmetry", (False, True))
+def test_book_thickness_matches_bfs(symmetry):
+    for edges in make_random_graphs(12, 7, 3):
+        graph = SimpleGraph(edges)
+        thickness, book_embedding = graph.find_book_thickness(symmetry=symmetry, bounds=True,
+                                                              stats=SearchStats(quiet=True))
+        assert thickness == baseline_thickness(edges)
+        assert is_valid(graph.edges, book_embedding, thickness)
+        assert book_embedding.lowerBound <= thickness
+
+def test_count_embeddable_spines_matches_brute_force():
+    for edges in make_random_graphs(8, 5, 4):
+        num_vertices = BookThickness.get_num_vertices(edges)
+        expected = sum(1 for spine in Perms.iter_spines(num_vertices) if fits_in_pages(edges, spine, 2))
+        assert BookThickness.count_embeddable_spines(2, edges, num_vertices) == expected
+
+def test_planarity():
+    k5 = SimpleGraph.complete_graph(5)
+    k33 = SimpleGraph.complete_bipartite_graph(3, 3)
+    k4 = SimpleGraph.complete_graph(4)
+    k23 = SimpleGraph.complete_bipartite_graph(2, 3)
+    cycle = SimpleGraph([(1, 2), (2, 3), (3, 4), (4, 5), (1, 5)])
+    assert not Bounds.is_planar(k5.vertices, k5.edges)
+    assert not Bounds.is_planar(k33.vertices, k33.edges)
+    assert Bounds.is_planar(k5.vertices, k5.edges[1:])
+    assert Bounds.is_planar(k33.vertices, k33.edges[1:])
+    assert Bounds.is_planar(k4.vertices, k4.edges) and not Bounds.is_outerplanar(k4.vertices, k4.edges)
+    assert Bounds.is_planar(k23.vertices, k23.edges) and not Bounds.is_outerplanar(k23.vertices, k23.edges)
+    assert Bounds.is_outerplanar(cycle.vertices, cycle.edges)
+    assert Bounds.find_lower_bound(k5.vertices, k5.edges)[0] == 3
+    assert Bounds.find_lower_bound(k33.vertices, k33.edges)[0] == 3
+
+def test_lower_bound_never_above_bfs():
+    for edges in make_random_graphs(12, 7, 5):
+        vertices = list(range(1, BookThickness.get_num_vertices(edges) + 1))
+        assert Bounds.find_lower_bound(vertices, edges)[0] <= baseline_thickness(edges)
+
+def test_canonical_form_ignores_labels():
+    generator = random.Random(6)
+    for edges in make_random_graphs(20, 7, 6):
+        vertices = list(range(1, BookThickness.get_num_vertices(edges) + 1))
+        labels = vertices.copy()
+        generator.shuffle(labels)
+        relabelled = [(min(labels[a - 1], labels[b - 1]), max(labels[a - 1], labels[b - 1])) for a, b in edges]
+        assert Symmetry.get_canonical_form(vertices, edges)[0] == Symmetry.get_canonical_form(vertices, relabelled)[0]
+    # a 6-cycle and two triangles have the same degrees but are not isomorphic
+    hexagon = [(1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (1, 6)]
+    triangles = [(1, 2), (2, 3), (1, 3), (4, 5), (5, 6), (4, 6)]
+    vertices = list(range(1, 7))
+    assert Symmetry.get_canonical_form(vertices, hexagon)[0] != Symmetry.get_canonical_form(vertices, triangles)[0]
+
+def test_symmetric_spines_cover_every_orbit_once():
+    for edges in make_random_graphs(20, 7, 7) + [SimpleGraph.complete_bipartite_graph(3, 3).edges]:
+        graph = SimpleGraph(edges)
+        generators = graph.find_automorphism_generators()
+        group = [dict(zip(graph.vertices, graph.vertices))]
+        for automorphism in group:
+            for generator in generators:
+                product = {vert: generator[automorphism[vert]] for vert in graph.vertices}
+                if product not in group:
+                    group.append(product)
+
+        def orbit_key(spine):
+            images = []
+            for automorphism in group:
+                image = [automorphism[vert] for vert in spine]
+                for r in range(len(image)):
+                    rotation = image[r:] + image[:r]
+                    images.append(tuple(rotation))
+                    images.append(tuple(rotation[:1] + rotation[:0:-1]))
+            return min(images)
+
+        keys = [orbit_key(spine) for spine in graph.make_symmetric_spine_generator()()]
+        assert len(keys) == len(set(keys))
+        assert set(keys) == set(orbit_key(spine) for spine in Perms.iter_spines(graph.num_vertices))
+
+def test_zero_pages():
+    graph = SimpleGraph([(1, 3), (2, 4), (1, 2)])
+    for method in METHODS:
+        assert graph.find_n_page_embedding(0, method=method, stats=SearchStats(quiet=True)) == -1
+        assert BookThickness.find_n_page_embedding_with_spine(0, graph.edges, [1, 2, 3, 4]) == -1
+
+def test_edgeless_graphs():
+    stats = SearchStats(quiet=True)
+    graph = SimpleGraph([])
+    assert graph.find_book_thickness(stats=stats) == (0, None)
+    book_embedding = graph.find_n_page_embedding(0, stats=stats)
+    assert book_embedding != -1 and book_embedding.addedEdges == []
+    assert graph.find_book_embedding(0, stats=stats).addedEdges == []
+    result = Sharding.search_shard([], 0)
+    assert Sharding.merge_shard_results([result])["embeddable"] is True
+    # in the total graph of Z2 neither 0 + 1 nor 1 + 0 is a zero divisor, so its two vertices have no edges
+    assert SimpleGraph.total_graph("Z2").find_book_thickness(stats=stats) == (0, None)
+    # the element 0 of Z3 is on no edge, but it still goes on the spine
+    thickness, book_embedding = SimpleGraph.total_graph("Z3").find_book_thickness(stats=stats)
+    assert thickness == 1 and sorted(book_embedding.spine) == [1, 2, 3]
+
+def test_prefilter_bounds_never_above_bfs():
+    pytest.importorskip("numpy")
+    import BookThickness.Prefilter as Prefilter
+    for edges in make_random_graphs(8, 6, 8):
+        spines = list(Perms.iter_spines(BookThickness.get_num_vertices(edges)))
+        for spine, bound in zip(spines, Prefilter.find_page_bounds(edges, spines)):
+            assert bound == 0 or BookThickness.find_n_page_embedding_with_spine(bound - 1, edges, spine, "bfs") == -1